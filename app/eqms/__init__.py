@@ -1,5 +1,8 @@
 import os
+import threading
+import time
 from datetime import timedelta
+from types import SimpleNamespace
 
 from flask import Flask, g, render_template, request, session
 from dotenv import load_dotenv
@@ -7,6 +10,7 @@ from sqlalchemy import inspect as sa_inspect
 
 from app.eqms.config import load_config
 from app.eqms.db import init_db, teardown_db_session
+from app.eqms.json_provider import init_json
 from app.eqms.routes import bp as routes_bp
 from app.eqms.auth import bp as auth_bp, load_current_user
 from app.eqms.admin import bp as admin_bp
@@ -20,6 +24,9 @@ from app.eqms.modules.supplies.admin import bp as supplies_bp
 from app.eqms.modules.manufacturing.admin import bp as manufacturing_bp
 from app.eqms.modules.nre_projects.admin import bp as nre_projects_bp
 
+# How long /admin requests skip the schema health check after the inspection itself failed.
+SCHEMA_HEALTH_RETRY_SECONDS = 60
+
 
 def create_app() -> Flask:
     load_dotenv()
@@ -27,6 +34,21 @@ def create_app() -> Flask:
     app.config.from_mapping(load_config())
     app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(hours=8)
     app.config["SESSION_REFRESH_EACH_REQUEST"] = True
+    init_json(app)
+
+    # gzip/br for JSON and CSV responses when Flask-Compress is installed (optional).
+    # HTML is left alone: pages can echo user input next to the CSRF token (BREACH).
+    # Streamed responses (the CSV exports) pass through untouched so they aren't buffered.
+    try:
+        from flask_compress import Compress
+    except ImportError:
+        Compress = None
+    if Compress is not None:
+        app.config.setdefault("COMPRESS_MIMETYPES", ["application/json", "text/csv"])
+        app.config.setdefault("COMPRESS_STREAMS", False)
+        app.config.setdefault("COMPRESS_MIN_SIZE", 1024)
+        app.config.setdefault("COMPRESS_ALGORITHM", ["br", "gzip"])
+        Compress(app)
     
     # Allow up to 50MB uploads (for bulk PDF imports)
     # Individual file limits (10MB) enforced in route handlers
@@ -144,11 +166,14 @@ def create_app() -> Flask:
     app.teardown_appcontext(teardown_db_session)
 
     # Migration health (lean): detect drift between code expectations and DB schema.
-    app.config.setdefault("_schema_health_ok", True)
-    app.config.setdefault("_schema_health_missing", [])
-    app.config.setdefault("_schema_health_logged", False)
-
-    def _run_schema_health_check() -> None:
+    # Runtime state lives in app.extensions, not app.config (it is not configuration).
+    schema_health = app.extensions["schema_health"] = SimpleNamespace(
+        checked=False, ok=True, missing=[], next_retry_at=0.0
+    )
+    schema_health_lock = threading.Lock()
+
+    def _run_schema_health_check() -> bool:
+        """Inspect the DB and record the result; False if the inspection itself failed."""
         ok = True
         missing: list[str] = []
         try:
@@ -184,25 +209,37 @@ def create_app() -> Flask:
                     missing.append("distribution_log_entries.sales_order_id")
 
         except Exception as e:
-            app.logger.exception("Schema health check failed: %s", e)
+            # Logged once per retry window (see _schema_health_guardrail), not once per request.
+            app.logger.exception(
+                "Schema health check failed; retrying in %ss: %s", SCHEMA_HEALTH_RETRY_SECONDS, e
+            )
+            return False
 
         if missing:
             ok = False
-            app.config["_schema_health_missing"] = missing
-            if not app.config.get("_schema_health_logged"):
-                app.config["_schema_health_logged"] = True
-                app.logger.error("DB schema out of date; run `alembic upgrade head`. Missing: %s", ", ".join(missing))
+            schema_health.missing = missing
+            app.logger.error("DB schema out of date; run `alembic upgrade head`. Missing: %s", ", ".join(missing))
 
-        app.config["_schema_health_ok"] = ok
-
-    _run_schema_health_check()
+        schema_health.ok = ok
+        return True
 
     @app.before_request
     def _schema_health_guardrail():  # type: ignore[no-redef]
-        if app.config.get("_schema_health_ok"):
+        if not request.path.startswith("/admin"):
+            return None
+        # Deferred from create_app() so CLI scripts, tests and health-check-only workers never inspect the DB
+        # Only one request runs it. A failed inspection (e.g. DB unreachable) is retried after
+        # SCHEMA_HEALTH_RETRY_SECONDS, so an outage doesn't queue every /admin request on the lock.
+        if not schema_health.checked and time.monotonic() >= schema_health.next_retry_at:
+            with schema_health_lock:
+                if not schema_health.checked and time.monotonic() >= schema_health.next_retry_at:
+                    schema_health.checked = _run_schema_health_check()
+                    if not schema_health.checked:
+                        schema_health.next_retry_at = time.monotonic() + SCHEMA_HEALTH_RETRY_SECONDS
+        if schema_health.ok:
             return None
-        if request.path.startswith("/admin") and getattr(g, "current_user", None):
-            return render_template("errors/schema_out_of_date.html", missing=app.config.get("_schema_health_missing") or []), 500
+        if getattr(g, "current_user", None):
+            return render_template("errors/schema_out_of_date.html", missing=schema_health.missing), 500
         return None
 
     @app.errorhandler(500)
@@ -27,12 +27,9 @@ def _current_user() -> User:
 
 
 def _diagnostics_allowed() -> bool:
-    import os
     from app.eqms.rbac import user_has_permission
 
-    env = (os.environ.get("ENV") or "development").strip().lower()
-    enabled = (os.environ.get("ADMIN_DIAGNOSTICS_ENABLED") or "").strip() == "1"
-    if env != "production" or enabled:
+    if current_app.config.get("ADMIN_DIAGNOSTICS_OPEN"):
         return True
     user = getattr(g, "current_user", None)
     if user and user.is_active:
@@ -359,7 +356,11 @@ def diagnostics_storage():
         result["configured"] = True
         result["accessible"] = storage.root.exists() or True  # Will create on first write
     
-    return jsonify(result)
+    # Pollers revalidate with If-None-Match and get an empty 304 while the status is unchanged
+    resp = jsonify(result)
+    resp.add_etag()
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp.make_conditional(request)
 
 
 @bp.get("/maintenance/customers/duplicates")
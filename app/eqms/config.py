@@ -15,12 +15,21 @@ class Settings:
     s3_access_key_id: str
     s3_secret_access_key: str
     storage_local_root: str
+    use_x_sendfile: bool
+    admin_diagnostics_enabled: bool
+
+
+_TRUE_VALUES = frozenset(("1", "true", "yes"))
 
 
 def _getenv(name: str, default: str = "") -> str:
     return (os.environ.get(name) or default).strip()
 
 
+def _getenv_bool(name: str) -> bool:
+    return _getenv(name).lower() in _TRUE_VALUES
+
+
 def load_settings() -> Settings:
     return Settings(
         secret_key=_getenv("SECRET_KEY", "change-me"),
@@ -33,6 +42,8 @@ def load_settings() -> Settings:
         s3_access_key_id=_getenv("S3_ACCESS_KEY_ID", ""),
         s3_secret_access_key=_getenv("S3_SECRET_ACCESS_KEY", ""),
         storage_local_root=_getenv("STORAGE_LOCAL_ROOT", ""),
+        use_x_sendfile=_getenv_bool("USE_X_SENDFILE"),
+        admin_diagnostics_enabled=_getenv("ADMIN_DIAGNOSTICS_ENABLED") == "1",
     )
 
 
@@ -50,6 +61,10 @@ def load_config() -> dict:
         "S3_ACCESS_KEY_ID": s.s3_access_key_id,
         "S3_SECRET_ACCESS_KEY": s.s3_secret_access_key,
         "STORAGE_LOCAL_ROOT": s.storage_local_root,
+        # Let nginx/Apache stream local-storage downloads (requires a front-end mapping for the storage root)
+        "USE_X_SENDFILE": s.use_x_sendfile,
+        # Diagnostics are open to everyone outside production, or in production when explicitly enabled
+        "ADMIN_DIAGNOSTICS_OPEN": s.env.lower() != "production" or s.admin_diagnostics_enabled,
         # security defaults
         "SESSION_COOKIE_HTTPONLY": True,
         "SESSION_COOKIE_SAMESITE": "Lax",
@@ -3,7 +3,10 @@ Central constants for the EQMS application.
 """
 from __future__ import annotations
 
-# Valid SKUs for SILQ products
+# Valid SKUs for SILQ products.
+# The ck_distribution_log_sku and ck_distribution_lines_sku CHECKs (ebb33122a9ce, aa3f4c5d6e7f,
+# mirrored in rep_traceability/models.py) list these literally: adding a SKU also needs a
+# migration that replaces both CHECKs, and the models updated to match.
 VALID_SKUS = frozenset({"211810SPT", "211610SPT", "211410SPT"})
 
 # Excluded SKUs (IFUs, non-device items)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 from contextlib import contextmanager
 from collections.abc import Generator
 
@@ -25,7 +26,8 @@ def init_db(app: Flask) -> None:
             }
         )
     engine = create_engine(db_url, **engine_kwargs)
-    if app.config.get("ENV") != "production":
+    # Only hook pool checkouts when the debug line would actually be emitted; the listener runs per checkout.
+    if app.config.get("ENV") != "production" and app.logger.isEnabledFor(logging.DEBUG):
         @event.listens_for(engine, "checkout")
         def _receive_checkout(dbapi_connection, connection_record, connection_proxy):  # type: ignore[no-redef]
             app.logger.debug("DB connection checkout from pool")
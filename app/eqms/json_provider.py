@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    DefaultJSONProvider with orjson doing the encoding.
+
+    Output matches the stdlib provider: keys are still sorted per `sort_keys`, and
+    dates/Decimal/UUID still go through the provider's `default` hook (dates as HTTP dates),
+    so an app-level override of `default` applies here too.
+    Falls back to the stdlib path for pretty-printed (debug) output and custom kwargs, and
+    wherever orjson would not produce the same bytes (see `_encode`).
+    """
+
+    def _options(self) -> int:
+        opts = orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            opts |= orjson.OPT_SORT_KEYS
+        return opts
+
+    def _encode(self, obj: Any, option: int = 0) -> bytes | None:
+        """orjson encoding of `obj`, or None where it would differ from the stdlib output."""
+        try:
+            body = orjson.dumps(obj, default=self.default, option=self._options() | option)
+        except orjson.JSONEncodeError:
+            # Non-str dict keys (json sorts them before stringifying, orjson after) or an
+            # unserializable value (json raises the same TypeError on the fallback path).
+            return None
+        if self.ensure_ascii and not body.isascii():
+            # orjson always writes UTF-8; json escapes non-ASCII as \uXXXX.
+            return None
+        return body
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        body = None if kwargs else self._encode(obj)
+        if body is None:
+            return super().dumps(obj, **kwargs)
+        return body.decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = self._encode(obj, orjson.OPT_APPEND_NEWLINE)
+        if body is None:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json(app) -> None:
+    """Use orjson for jsonify()/request.get_json() when it is installed."""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
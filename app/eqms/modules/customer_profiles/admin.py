@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
+from operator import itemgetter
 
 from flask import Blueprint, flash, g, redirect, render_template, request, url_for
 
@@ -353,7 +354,7 @@ def customer_detail(customer_id: int):
                 sku_totals[line.sku] = sku_totals.get(line.sku, 0) + int(line.quantity or 0)
         else:
             sku_totals[e.sku] = sku_totals.get(e.sku, 0) + int(e.quantity or 0)
-    sku_breakdown = [{"sku": sku, "units": units} for sku, units in sorted(sku_totals.items(), key=lambda kv: kv[1], reverse=True)]
+    sku_breakdown = [{"sku": sku, "units": units} for sku, units in sorted(sku_totals.items(), key=itemgetter(1), reverse=True)]
     
     # Customer stats dict
     customer_stats = {
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 
 
 def normalize_facility_name(name: str) -> str:
@@ -30,6 +31,7 @@ def normalize_facility_name(name: str) -> str:
     return s.strip()
 
 
+@lru_cache(maxsize=8192)  # Pure function of the name; dashboards key every distribution row through it
 def canonical_customer_key(name: str) -> str:
     """
     Normalize facility name to a stable canonical key for customer deduplication.
@@ -347,7 +347,7 @@ def download_file(file_id: int):
         abort(404)
 
     storage = storage_from_config(current_app.config)
-    fobj = storage.open(df.storage_key)
+    fobj = storage.download_source(df.storage_key)
 
     record_event(
         s,
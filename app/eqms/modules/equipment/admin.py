@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from datetime import date
 
 from flask import Blueprint, abort, current_app, flash, g, jsonify, redirect, render_template, request, send_file, session, url_for
@@ -44,6 +45,15 @@ def _current_user() -> User:
     return u
 
 
+def _list_folder(folder: str, suffix: str) -> list[str]:
+    """Filenames in `folder` ending with `suffix`; [] if the folder is missing (one listdir, no extra stat)."""
+    try:
+        names = os.listdir(folder)
+    except FileNotFoundError:
+        return []
+    return [f for f in names if f.lower().endswith(suffix)]
+
+
 # ---------- List ----------
 @bp.get("/equipment")
 @require_permission("equipment.view")
@@ -244,18 +254,11 @@ def equipment_detail(equipment_id: int):
 @bp.get("/equipment/bulk-import")
 @require_permission("equipment.edit")
 def equipment_bulk_import_get():
-    import os
-
-    requirements_forms: list[str] = []
-    spec_documents: list[str] = []
-
     req_folder = "docs/EquipmentRequirementsForm"
-    if os.path.exists(req_folder):
-        requirements_forms = [f for f in os.listdir(req_folder) if f.lower().endswith(".pdf")]
+    requirements_forms = _list_folder(req_folder, ".pdf")
 
     spec_folder = "docs/SpecificationsForm"
-    if os.path.exists(spec_folder):
-        spec_documents = [f for f in os.listdir(spec_folder) if f.lower().endswith(".docx")]
+    spec_documents = _list_folder(spec_folder, ".docx")
 
     return render_template(
         "admin/equipment/bulk_import.html",
@@ -269,7 +272,6 @@ def equipment_bulk_import_get():
 @bp.post("/equipment/bulk-import")
 @require_permission("equipment.edit")
 def equipment_bulk_import_post():
-    import os
     from app.eqms.modules.equipment.parsers.pdf import (
         EQUIPMENT_SPEC_MAP,
         parse_requirements_form_filename,
@@ -387,8 +389,8 @@ def equipment_bulk_import_post():
         _process_spec_file(f.filename, f.read())
 
     if use_server_folders:
-        req_files = [f for f in os.listdir(req_folder) if f.lower().endswith(".pdf")] if os.path.exists(req_folder) else []
-        spec_files = [f for f in os.listdir(spec_folder) if f.lower().endswith(".docx")] if os.path.exists(spec_folder) else []
+        req_files = _list_folder(req_folder, ".pdf")
+        spec_files = _list_folder(spec_folder, ".docx")
 
         for fname in req_files:
             file_path = os.path.join(req_folder, fname)
@@ -616,7 +618,7 @@ def equipment_document_download(equipment_id: int, doc_id: int):
         abort(404)
 
     storage = storage_from_config(current_app.config)
-    fobj = storage.open(doc.storage_key)
+    fobj = storage.download_source(doc.storage_key)
 
     record_event(
         s,
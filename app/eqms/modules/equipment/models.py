@@ -133,7 +133,8 @@ class ManagedDocument(Base):
     # Document metadata
     description: Mapped[str | None] = mapped_column(String(512), nullable=True)
     document_type: Mapped[str | None] = mapped_column(String(128), nullable=True)  # e.g., "Calibration Cert", "PM Record", "Audit Report", "COI"
-    extracted_text: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Full text of the uploaded PDF; deferred so document listings don't pull it for every row.
+    extracted_text: Mapped[str | None] = mapped_column(Text, nullable=True, deferred=True)
     category: Mapped[str | None] = mapped_column(String(64), nullable=True, default="general")
     is_primary: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
 
@@ -513,7 +513,7 @@ def suspension_document_download(lot_id: int, doc_id: int):
 
     storage = storage_from_config(current_app.config)
     try:
-        fobj = storage.open(doc.storage_key)
+        fobj = storage.download_source(doc.storage_key)
         return send_file(
             fobj,
             mimetype=doc.content_type,
@@ -191,8 +191,6 @@ def nre_order_upload_pdf(customer_id: int, order_id: int):
 @require_permission("sales_orders.view")
 def nre_download_pdf(attachment_id: int):
     """Download a PDF attachment."""
-    import io
-    
     s = db_session()
     attachment = s.query(OrderPdfAttachment).filter(OrderPdfAttachment.id == attachment_id).one_or_none()
     if not attachment:
@@ -200,13 +198,13 @@ def nre_download_pdf(attachment_id: int):
     
     storage = storage_from_config(current_app.config)
     try:
-        pdf_bytes = storage.get_bytes(attachment.storage_key)
+        fobj = storage.download_source(attachment.storage_key)
     except Exception:
         flash("PDF not found in storage.", "danger")
         return redirect(request.referrer or url_for("nre_projects.nre_projects_index"))
     
     return send_file(
-        io.BytesIO(pdf_bytes),
+        fobj,
         download_name=attachment.filename,
         as_attachment=True,
         mimetype="application/pdf",
@@ -3,38 +3,70 @@ from __future__ import annotations
 import csv
 import io
 import logging
-from datetime import date
-
-from flask import Blueprint, flash, g, redirect, render_template, request, send_file, url_for, current_app
+import os
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime
+from operator import itemgetter
+from typing import Any
+
+from flask import (
+    Blueprint,
+    Response,
+    abort,
+    current_app,
+    flash,
+    g,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    send_file,
+    stream_with_context,
+    url_for,
+)
+from sqlalchemy import func, or_
+from werkzeug.utils import secure_filename
 
 # Module-level logger for PDF import and other operations
 logger = logging.getLogger(__name__)
 
+from app.eqms.audit import record_event
 from app.eqms.db import db_session
 from app.eqms.models import User
 from app.eqms.modules.rep_traceability.models import (
     ApprovalEml,
+    DistributionLine,
     DistributionLogEntry,
     OrderPdfAttachment,
+    SalesOrder,
+    SalesOrderLine,
     TracingReport,
 )
 from app.eqms.modules.rep_traceability.parsers.csv import parse_distribution_csv
+from app.eqms.modules.rep_traceability.parsers.pdf import parse_sales_orders_pdf, split_pdf_into_pages
 from app.eqms.modules.rep_traceability.service import (
     check_duplicate_manual_csv,
     compute_sales_dashboard,
+    DISTRIBUTION_CSV_FIELDS,
     create_distribution_entry,
     delete_distribution_entry,
+    distribution_csv_row,
     generate_tracing_report_csv,
+    match_distribution_to_sales_order,
+    normalize_order_number,
     query_distribution_entries,
     update_distribution_entry,
     upload_approval_eml,
     validate_distribution_payload,
 )
-from app.eqms.modules.customer_profiles.models import Customer
-from app.eqms.modules.customer_profiles.service import find_or_create_customer
+from app.eqms.modules.customer_profiles.models import Customer, CustomerNote, CustomerRep, Rep
+from app.eqms.modules.customer_profiles.service import add_customer_note, find_or_create_customer, get_customer_by_id
+from app.eqms.modules.customer_profiles.utils import canonical_customer_key
+from app.eqms.modules.shipstation_sync.parsers import load_lot_log_with_inventory, normalize_lot
 from app.eqms.rbac import require_permission
-from app.eqms.storage import storage_from_config
+from app.eqms.storage import StorageError, storage_from_config
 from app.eqms.modules.rep_traceability.utils import (
+    VALID_SKUS,
     normalize_text,
     normalize_source,
     parse_distribution_filters,
@@ -44,6 +76,22 @@ from app.eqms.modules.rep_traceability.utils import (
 
 bp = Blueprint("rep_traceability", __name__)
 
+SALES_DASHBOARD_CSV_FIELDS = (
+    "Customer Type",
+    "Ship Date",
+    "Order #",
+    "Facility",
+    "City",
+    "State",
+    "SKU",
+    "Lot",
+    "Quantity",
+    "Source",
+    "Customer ID",
+    "Customer Key",
+)
+LOT_TRACKING_CSV_FIELDS = ("SKU", "Current Lot", "Total Produced", "Total Distributed", "Remaining", "Last Ship")
+
 
 def _current_user() -> User:
     u = getattr(g, "current_user", None)
@@ -52,6 +100,29 @@ def _current_user() -> User:
     return u
 
 
+def _iter_csv(rows: Iterable[Iterable[Any]], *, chunk_rows: int = 500) -> Iterator[str]:
+    """Encode rows as CSV text, yielding one chunk per `chunk_rows` rows."""
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    for i, row in enumerate(rows, 1):
+        w.writerow(row)
+        if i % chunk_rows == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    tail = buf.getvalue()
+    if tail:
+        yield tail
+
+
+def _csv_download(rows: Iterable[Iterable[Any]], *, filename: str) -> Response:
+    """Stream rows as a CSV attachment instead of building the whole file in memory."""
+    resp = Response(stream_with_context(_iter_csv(rows)), mimetype="text/csv")
+    resp.headers.set("Content-Disposition", "attachment", filename=filename)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
 def _store_pdf_attachment(
     s,
     *,
@@ -68,10 +139,6 @@ def _store_pdf_attachment(
     Raises:
         StorageError: If storage is misconfigured or inaccessible
     """
-    from werkzeug.utils import secure_filename
-    from datetime import datetime
-    from app.eqms.modules.rep_traceability.models import OrderPdfAttachment
-    from app.eqms.storage import StorageError
 
     storage = storage_from_config(current_app.config)
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
@@ -145,13 +212,23 @@ def _match_distribution_for_label(
 def _parse_filters() -> dict:
     return parse_distribution_filters(request.args)
 
+
+def _parse_dashboard_start_date() -> date | None:
+    """start_date query arg shared by the sales dashboard and its export (default 2025-01-01); None if malformed."""
+    start_date_s = normalize_text(request.args.get("start_date")) or "2025-01-01"
+    try:
+        return date.fromisoformat(start_date_s)
+    except ValueError:
+        return None
+
+
 def _customers_for_select(s) -> list[Customer]:
     return s.query(Customer).order_by(Customer.facility_name.asc(), Customer.id.asc()).limit(500).all()
 
 
 def _is_catheter_order(order_data: dict) -> bool:
     for line in order_data.get("lines", []):
-        if line.get("sku") in {"211810SPT", "211610SPT", "211410SPT"}:
+        if line.get("sku") in VALID_SKUS:
             return True
     return False
 
@@ -179,7 +256,6 @@ def distribution_log_list():
     prev_url = url_for("rep_traceability.distribution_log_list", page=page - 1, **filters_for_urls) if has_prev else None
     next_url = url_for("rep_traceability.distribution_log_list", page=page + 1, **filters_for_urls) if has_next else None
     export_url = url_for("rep_traceability.distribution_log_export", **filters_for_urls)
-    from app.eqms.modules.customer_profiles.models import Rep
     reps = s.query(Rep).filter(Rep.is_active.is_(True)).order_by(Rep.name.asc()).all()
 
     return render_template(
@@ -201,7 +277,6 @@ def distribution_log_list():
 @bp.get("/distribution-log/new")
 @require_permission("distribution_log.create")
 def distribution_log_new_get():
-    from app.eqms.modules.rep_traceability.models import SalesOrder, OrderPdfAttachment
     s = db_session()
     customers = _customers_for_select(s)
     # Recent sales orders for dropdown (most recent 100)
@@ -282,7 +357,6 @@ def distribution_log_new_post():
     # Validate sales_order_id matches customer_id (if provided)
     sales_order_id = normalize_text(payload.get("sales_order_id"))
     if sales_order_id:
-        from app.eqms.modules.rep_traceability.models import SalesOrder
         so = s.query(SalesOrder).filter(SalesOrder.id == int(sales_order_id)).one_or_none()
         if not so:
             flash("Selected sales order was not found.", "danger")
@@ -333,13 +407,9 @@ def distribution_log_new_post():
 @bp.get("/distribution-log/<int:entry_id>/edit")
 @require_permission("distribution_log.edit")
 def distribution_log_edit_get(entry_id: int):
-    from app.eqms.modules.rep_traceability.models import SalesOrder, OrderPdfAttachment
-    from sqlalchemy import or_
-    
     s = db_session()
     entry = s.get(DistributionLogEntry, entry_id)
     if not entry:
-        from flask import abort
         abort(404)
     
     # Load PDF attachments for this distribution
@@ -374,8 +444,6 @@ def distribution_log_edit_post(entry_id: int):
     u = _current_user()
     entry = s.get(DistributionLogEntry, entry_id)
     if not entry:
-        from flask import abort
-
         abort(404)
 
     reason = normalize_text(request.form.get("reason"))
@@ -425,7 +493,6 @@ def distribution_log_edit_post(entry_id: int):
         # Validate sales_order_id matches customer_id (if provided)
         sales_order_id = normalize_text(payload.get("sales_order_id"))
         if sales_order_id:
-            from app.eqms.modules.rep_traceability.models import SalesOrder
             so = s.query(SalesOrder).filter(SalesOrder.id == int(sales_order_id)).one_or_none()
             if not so:
                 flash("Selected sales order was not found.", "danger")
@@ -454,8 +521,6 @@ def distribution_log_delete(entry_id: int):
     u = _current_user()
     entry = s.get(DistributionLogEntry, entry_id)
     if not entry:
-        from flask import abort
-
         abort(404)
 
     reason = normalize_text(request.form.get("reason"))
@@ -473,8 +538,6 @@ def distribution_log_delete(entry_id: int):
 @require_permission("distribution_log.edit")
 def distribution_upload_pdf(entry_id: int):
     """Upload a PDF to a distribution entry."""
-    from werkzeug.utils import secure_filename
-    from datetime import datetime
     
     s = db_session()
     u = _current_user()
@@ -523,8 +586,6 @@ def distribution_upload_pdf(entry_id: int):
 @require_permission("distribution_log.view")
 def download_pdf_attachment(attachment_id: int):
     """Download a PDF attachment."""
-    import io
-    
     s = db_session()
     attachment = s.query(OrderPdfAttachment).filter(OrderPdfAttachment.id == attachment_id).one_or_none()
     if not attachment:
@@ -533,13 +594,13 @@ def download_pdf_attachment(attachment_id: int):
     
     storage = storage_from_config(current_app.config)
     try:
-        pdf_bytes = storage.get_bytes(attachment.storage_key)
+        fobj = storage.download_source(attachment.storage_key)
     except Exception:
         flash("PDF not found in storage.", "danger")
         return redirect(request.referrer or url_for("rep_traceability.distribution_log_list"))
     
     return send_file(
-        io.BytesIO(pdf_bytes),
+        fobj,
         download_name=attachment.filename,
         as_attachment=True,
         mimetype="application/pdf",
@@ -550,65 +611,47 @@ def download_pdf_attachment(attachment_id: int):
 @require_permission("distribution_log.view")
 def distribution_log_entry_details(entry_id: int):
     """Return JSON with entry details for in-page modal."""
-    from flask import jsonify, url_for
-    from sqlalchemy import func
-    from app.eqms.modules.rep_traceability.models import SalesOrder, DistributionLine
-    import os
     
     s = db_session()
     entry = s.get(DistributionLogEntry, entry_id)
     if not entry:
         return jsonify({"error": "Entry not found"}), 404
     
+    entry_lines = (
+        s.query(DistributionLine)
+        .filter(DistributionLine.distribution_entry_id == entry.id)
+        .order_by(DistributionLine.id.asc())
+        .all()
+    )
+
     # Apply LotLog corrections for display
     corrected_lot = entry.lot_number
-    lines_data: list[dict[str, Any]] = []
+    lot_corrections: dict[str, str] | None = None
     try:
-        from app.eqms.modules.shipstation_sync.parsers import load_lot_log_with_inventory, normalize_lot
         lotlog_path = (os.environ.get("SHIPSTATION_LOTLOG_PATH") or os.environ.get("LotLog_Path") or "app/eqms/data/LotLog.csv").strip()
         _, lot_corrections, _, _ = load_lot_log_with_inventory(lotlog_path)
         raw_lot = (entry.lot_number or "").strip()
         if raw_lot:
             normalized = normalize_lot(raw_lot)
             corrected_lot = lot_corrections.get(normalized, normalized)
-        entry_lines = (
-            s.query(DistributionLine)
-            .filter(DistributionLine.distribution_entry_id == entry.id)
-            .order_by(DistributionLine.id.asc())
-            .all()
-        )
-        for line in entry_lines:
-            line_lot = (line.lot_number or "").strip()
-            corrected_line_lot = line_lot
-            if line_lot:
-                normalized_line = normalize_lot(line_lot)
-                corrected_line_lot = lot_corrections.get(normalized_line, normalized_line)
-            lines_data.append(
-                {
-                    "sku": line.sku,
-                    "lot_number": line.lot_number,
-                    "lot_corrected": corrected_line_lot,
-                    "quantity": int(line.quantity or 0),
-                }
-            )
     except Exception:
-        pass  # Graceful fallback if LotLog unavailable
-    if not lines_data:
-        entry_lines = (
-            s.query(DistributionLine)
-            .filter(DistributionLine.distribution_entry_id == entry.id)
-            .order_by(DistributionLine.id.asc())
-            .all()
+        lot_corrections = None  # Graceful fallback if LotLog unavailable
+
+    lines_data: list[dict[str, Any]] = []
+    for line in entry_lines:
+        corrected_line_lot = line.lot_number
+        line_lot = (line.lot_number or "").strip()
+        if lot_corrections is not None and line_lot:
+            normalized_line = normalize_lot(line_lot)
+            corrected_line_lot = lot_corrections.get(normalized_line, normalized_line)
+        lines_data.append(
+            {
+                "sku": line.sku,
+                "lot_number": line.lot_number,
+                "lot_corrected": corrected_line_lot,
+                "quantity": int(line.quantity or 0),
+            }
         )
-        for line in entry_lines:
-            lines_data.append(
-                {
-                    "sku": line.sku,
-                    "lot_number": line.lot_number,
-                    "lot_corrected": line.lot_number,
-                    "quantity": int(line.quantity or 0),
-                }
-            )
     
     # Get linked sales order if exists
     order_data = None
@@ -624,7 +667,6 @@ def distribution_log_entry_details(entry_id: int):
     
     # Get attachments linked to EITHER sales_order OR distribution entry
     # This ensures both SO-level PDFs and distribution-level labels are shown
-    from sqlalchemy import or_
     attachment_filters = []
     if entry.sales_order_id:
         attachment_filters.append(OrderPdfAttachment.sales_order_id == entry.sales_order_id)
@@ -643,8 +685,6 @@ def distribution_log_entry_details(entry_id: int):
     customer_stats = None
     notes_data = []
     if entry.customer_id:
-        from app.eqms.modules.customer_profiles.models import Customer, CustomerRep
-        from app.eqms.modules.customer_profiles.models import CustomerNote
         customer = s.get(Customer, entry.customer_id)
         if customer:
             customer_data = {
@@ -664,56 +704,61 @@ def distribution_log_entry_details(entry_id: int):
             ]
             
             # Calculate customer stats - ONLY from matched distributions
-            customer_entries = (
-                s.query(DistributionLogEntry)
-                .filter(
-                    DistributionLogEntry.customer_id == customer.id,
-                    DistributionLogEntry.sales_order_id.isnot(None)  # Only matched
+            customer_filter = (
+                DistributionLogEntry.customer_id == customer.id,
+                DistributionLogEntry.sales_order_id.isnot(None),  # Only matched
+            )
+            entry_count, first_order, last_order, total_orders, entry_units = (
+                s.query(
+                    func.count(DistributionLogEntry.id),
+                    func.min(DistributionLogEntry.ship_date),
+                    func.max(DistributionLogEntry.ship_date),
+                    func.count(func.distinct(func.nullif(DistributionLogEntry.order_number, ""))),
+                    func.coalesce(func.sum(DistributionLogEntry.quantity), 0),
                 )
-                .all()
+                .filter(*customer_filter)
+                .one()
             )
             customer_lines = (
                 s.query(DistributionLine, DistributionLogEntry.ship_date)
                 .join(DistributionLogEntry, DistributionLogEntry.id == DistributionLine.distribution_entry_id)
-                .filter(
-                    DistributionLogEntry.customer_id == customer.id,
-                    DistributionLogEntry.sales_order_id.isnot(None),
-                )
+                .filter(*customer_filter)
                 .order_by(DistributionLogEntry.ship_date.desc(), DistributionLine.id.desc())
                 .all()
             )
             
-            if customer_entries:
-                first_order = min(e.ship_date for e in customer_entries if e.ship_date)
-                last_order = max(e.ship_date for e in customer_entries if e.ship_date)
-                total_orders = len({e.order_number for e in customer_entries if e.order_number})
-                if customer_lines:
-                    total_units = sum(int(line.quantity or 0) for line, _ in customer_lines)
-                else:
-                    total_units = sum(int(e.quantity or 0) for e in customer_entries)
-                
-                # Top SKUs
+            if entry_count:
+                # Top SKUs and recent lots come from lines when present, else from the entries themselves
                 sku_totals: dict[str, int] = {}
                 if customer_lines:
+                    total_units = sum(int(line.quantity or 0) for line, _ in customer_lines)
                     for line, _ in customer_lines:
                         if line.sku:
                             sku_totals[line.sku] = sku_totals.get(line.sku, 0) + int(line.quantity or 0)
-                else:
-                    for e in customer_entries:
-                        if e.sku:
-                            sku_totals[e.sku] = sku_totals.get(e.sku, 0) + int(e.quantity or 0)
-                top_skus = sorted(sku_totals.items(), key=lambda kv: kv[1], reverse=True)[:5]
-                
-                # Recent lots (unique)
-                if customer_lines:
                     recent_lots = list(dict.fromkeys(
                         line.lot_number for line, _ in customer_lines if line.lot_number
                     ))[:5]
                 else:
+                    total_units = int(entry_units or 0)
+                    for sku, units in (
+                        s.query(DistributionLogEntry.sku, func.sum(DistributionLogEntry.quantity))
+                        .filter(*customer_filter)
+                        .group_by(DistributionLogEntry.sku)
+                        .all()
+                    ):
+                        if sku:
+                            sku_totals[sku] = int(units or 0)
                     recent_lots = list(dict.fromkeys(
-                        e.lot_number for e in sorted(customer_entries, key=lambda x: x.ship_date or date.min, reverse=True)
-                        if e.lot_number
+                        lot
+                        for (lot,) in (
+                            s.query(DistributionLogEntry.lot_number)
+                            .filter(*customer_filter)
+                            .order_by(DistributionLogEntry.ship_date.desc(), DistributionLogEntry.id.desc())
+                            .all()
+                        )
+                        if lot
                     ))[:5]
+                top_skus = sorted(sku_totals.items(), key=itemgetter(1), reverse=True)[:5]
                 
                 customer_stats = {
                     "first_order": str(first_order) if first_order else None,
@@ -745,7 +790,6 @@ def distribution_log_entry_details(entry_id: int):
             ]
 
     # Audit info (created/updated by)
-    from app.eqms.models import User
     created_by = s.get(User, entry.created_by_user_id) if entry.created_by_user_id else None
     updated_by = s.get(User, entry.updated_by_user_id) if entry.updated_by_user_id else None
     
@@ -804,9 +848,6 @@ def distribution_log_upload_pdf(entry_id: int):
     Upload PDF to match an unmatched distribution entry.
     Creates or matches a sales order and links it to the distribution.
     """
-    from flask import jsonify
-    from app.eqms.modules.rep_traceability.models import SalesOrder, SalesOrderLine, OrderPdfAttachment
-    from app.eqms.audit import record_event
     
     s = db_session()
     u = _current_user()
@@ -827,7 +868,6 @@ def distribution_log_upload_pdf(entry_id: int):
     # Try to parse the PDF
     parsed_orders = []
     try:
-        from app.eqms.modules.rep_traceability.parsers.pdf import parse_sales_orders_pdf
         result = parse_sales_orders_pdf(pdf_bytes)
         parsed_orders = result.orders
         if result.errors:
@@ -837,7 +877,7 @@ def distribution_log_upload_pdf(entry_id: int):
                 "; ".join([f"Page {e.row_index}: {e.message}" for e in result.errors[:5]]),
             )
     except Exception as e:
-        current_app.logger.warning(f"PDF parse failed for distribution {entry_id}: {e}")
+        current_app.logger.warning("PDF parse failed for distribution %s: %s", entry_id, e)
     
     order = None
     if parsed_orders:
@@ -878,7 +918,7 @@ def distribution_log_upload_pdf(entry_id: int):
                     customer_id = customer.id
                     entry.customer_id = customer_id  # Link distribution to customer
                 except Exception as e:
-                    current_app.logger.warning(f"Failed to create customer for distribution {entry_id}: {e}")
+                    current_app.logger.warning("Failed to create customer for distribution %s: %s", entry_id, e)
             
             if customer_id:
                 # Create new sales order
@@ -938,7 +978,7 @@ def distribution_log_upload_pdf(entry_id: int):
                     customer_id = customer.id
                     entry.customer_id = customer_id  # Link distribution to customer
                 except Exception as e:
-                    current_app.logger.warning(f"Failed to create customer for distribution {entry_id}: {e}")
+                    current_app.logger.warning("Failed to create customer for distribution %s: %s", entry_id, e)
             
             if customer_id:
                 order = SalesOrder(
@@ -976,7 +1016,6 @@ def distribution_log_upload_pdf(entry_id: int):
             user=u,
         )
         
-        from app.eqms.audit import record_event
         record_event(
             s,
             actor=u,
@@ -1014,8 +1053,6 @@ def distribution_log_upload_label(entry_id: int):
     
     Does not auto-match to Sales Order (labels typically don't contain order data).
     """
-    from flask import jsonify
-    from app.eqms.audit import record_event
     
     s = db_session()
     u = _current_user()
@@ -1093,7 +1130,6 @@ def distribution_log_import_csv_post():
         # If no match, leave customer_id = None; distribution will be unmatched until SO is imported.
         facility_name = normalize_text(r.get("facility_name"))
         if facility_name:
-            from app.eqms.modules.customer_profiles.utils import canonical_customer_key
             ck = canonical_customer_key(facility_name)
             c = s.query(Customer).filter(Customer.company_key == ck).one_or_none() if ck else None
             if c:
@@ -1132,7 +1168,6 @@ def distribution_log_import_csv_post():
         created += 1
 
     # Single audit event summarizing the import
-    from app.eqms.audit import record_event
 
     record_event(
         s,
@@ -1190,27 +1225,9 @@ def distribution_log_export():
     q = query_distribution_entries(s, filters=filters)
     entries = q.order_by(DistributionLogEntry.ship_date.asc(), DistributionLogEntry.id.asc()).all()
 
-    out = io.StringIO()
-    w = csv.writer(out)
-    w.writerow(["Ship Date", "Order #", "Facility", "City", "State", "SKU", "Lot", "Quantity", "Rep", "Source"])
-    for e in entries:
-        facility = e.customer.facility_name if getattr(e, "customer", None) else e.facility_name
-        w.writerow(
-            [
-                str(e.ship_date),
-                e.order_number,
-                facility,
-                e.city or "",
-                e.state or "",
-                e.sku,
-                e.lot_number,
-                e.quantity,
-                e.rep_name or (str(e.rep_id) if e.rep_id else ""),
-                e.source,
-            ]
-        )
-
-    from app.eqms.audit import record_event
+    def _rows() -> Iterator[Iterable[Any]]:
+        yield DISTRIBUTION_CSV_FIELDS
+        yield from map(distribution_csv_row, entries)
 
     record_event(
         s,
@@ -1222,15 +1239,8 @@ def distribution_log_export():
     )
     s.commit()
 
-    data = out.getvalue().encode("utf-8")
     filename = f"distribution_log_export_{date.today().strftime('%Y%m%d')}.csv"
-    return send_file(
-        io.BytesIO(data),
-        mimetype="text/csv",
-        as_attachment=True,
-        download_name=filename,
-        max_age=0,
-    )
+    return _csv_download(_rows(), filename=filename)
 
 
 # Tracing Reports + approvals are implemented in later commits.
@@ -1249,7 +1259,6 @@ def tracing_list():
 @require_permission("tracing_reports.generate")
 def tracing_generate_get():
     s = db_session()
-    from app.eqms.modules.customer_profiles.models import Rep
     reps = s.query(Rep).filter(Rep.is_active.is_(True)).order_by(Rep.name.asc()).all()
     return render_template("admin/tracing/generate.html", reps=reps)
 
@@ -1289,8 +1298,6 @@ def tracing_detail(report_id: int):
     s = db_session()
     r = s.get(TracingReport, report_id)
     if not r:
-        from flask import abort
-
         abort(404)
     approvals = (
         s.query(ApprovalEml)
@@ -1308,14 +1315,10 @@ def tracing_download(report_id: int):
     u = _current_user()
     r = s.get(TracingReport, report_id)
     if not r:
-        from flask import abort
-
         abort(404)
 
     storage = storage_from_config(current_app.config)
-    fobj = storage.open(r.report_storage_key)
-
-    from app.eqms.audit import record_event
+    fobj = storage.download_source(r.report_storage_key)
 
     record_event(
         s,
@@ -1338,8 +1341,6 @@ def approval_upload(report_id: int):
     u = _current_user()
     r = s.get(TracingReport, report_id)
     if not r:
-        from flask import abort
-
         abort(404)
 
     f = request.files.get("eml_file")
@@ -1369,14 +1370,10 @@ def approval_download(approval_id: int):
     u = _current_user()
     a = s.get(ApprovalEml, approval_id)
     if not a:
-        from flask import abort
-
         abort(404)
 
     storage = storage_from_config(current_app.config)
-    fobj = storage.open(a.storage_key)
-
-    from app.eqms.audit import record_event
+    fobj = storage.download_source(a.storage_key)
 
     record_event(
         s,
@@ -1398,10 +1395,8 @@ def sales_dashboard():
     s = db_session()
     u = _current_user()
 
-    start_date_s = normalize_text(request.args.get("start_date")) or "2025-01-01"
-    try:
-        start_date = date.fromisoformat(start_date_s)
-    except Exception:
+    start_date = _parse_dashboard_start_date()
+    if start_date is None:
         flash("Invalid start_date. Use YYYY-MM-DD.", "danger")
         return redirect(url_for("rep_traceability.sales_dashboard"))
 
@@ -1427,8 +1422,6 @@ def sales_dashboard():
         }
         flash("Error loading dashboard data. Some statistics may be incomplete.", "danger")
 
-    from app.eqms.audit import record_event
-
     record_event(
         s,
         actor=u,
@@ -1459,8 +1452,6 @@ def sales_dashboard():
 def notes_modal(entity_type: str, entity_id: int):
     """Return HTML for notes modal content (AJAX)."""
     s = db_session()
-    from app.eqms.modules.customer_profiles.models import CustomerNote
-    from app.eqms.modules.rep_traceability.models import SalesOrder
 
     customer_id = None
     if entity_type == "customer":
@@ -1495,10 +1486,6 @@ def notes_modal(entity_type: str, entity_id: int):
 @require_permission("customers.notes")
 def notes_create():
     """Create note via AJAX and return JSON."""
-    from flask import jsonify
-    from app.eqms.modules.customer_profiles.models import CustomerNote
-    from app.eqms.modules.customer_profiles.service import add_customer_note, get_customer_by_id
-    from app.eqms.modules.rep_traceability.models import SalesOrder
 
     s = db_session()
     u = _current_user()
@@ -1544,9 +1531,6 @@ def notes_create():
 @require_permission("customers.notes")
 def notes_list(entity_type: str, entity_id: int):
     """Return notes list as JSON."""
-    from flask import jsonify
-    from app.eqms.modules.customer_profiles.models import CustomerNote
-    from app.eqms.modules.rep_traceability.models import SalesOrder
 
     s = db_session()
     customer_id = None
@@ -1588,10 +1572,8 @@ def sales_dashboard_export():
     s = db_session()
     u = _current_user()
 
-    start_date_s = normalize_text(request.args.get("start_date")) or "2025-01-01"
-    try:
-        start_date = date.fromisoformat(start_date_s)
-    except Exception:
+    start_date = _parse_dashboard_start_date()
+    if start_date is None:
         flash("Invalid start_date. Use YYYY-MM-DD.", "danger")
         return redirect(url_for("rep_traceability.sales_dashboard"))
 
@@ -1602,35 +1584,17 @@ def sales_dashboard_export():
         flash("Error exporting dashboard data. Please try again.", "danger")
         return redirect(url_for("rep_traceability.sales_dashboard"))
     window_entries = data["window_entries"]
-    orders_by_customer = data["orders_by_customer"]
+    lifetime_order_counts = data["lifetime_order_counts"]
     customer_key_fn = data["customer_key_fn"]
     lot_tracking = data.get("lot_tracking", [])
     lot_min_year = data.get("lot_min_year")
 
-    out = io.StringIO()
-    w = csv.writer(out)
-    w.writerow(
-        [
-            "Customer Type",
-            "Ship Date",
-            "Order #",
-            "Facility",
-            "City",
-            "State",
-            "SKU",
-            "Lot",
-            "Quantity",
-            "Source",
-            "Customer ID",
-            "Customer Key",
-        ]
-    )
-    for e in window_entries:
-        key = customer_key_fn(e.customer_id, e.facility_name, e.customer_name)
-        lifetime_orders = len({o for o in orders_by_customer.get(key, set()) if o})
-        cust_type = "First-Time" if lifetime_orders <= 1 else "Repeat"
-        w.writerow(
-            [
+    def _rows() -> Iterator[Iterable[Any]]:
+        yield SALES_DASHBOARD_CSV_FIELDS
+        for e in window_entries:
+            key = customer_key_fn(e.customer_id, e.facility_name, e.customer_name)
+            cust_type = "First-Time" if lifetime_order_counts.get(key, 0) <= 1 else "Repeat"
+            yield (
                 cust_type,
                 str(e.ship_date),
                 e.order_number,
@@ -1643,26 +1607,21 @@ def sales_dashboard_export():
                 e.source,
                 e.customer_id or "",
                 key,
-            ]
-        )
+            )
 
-    if lot_tracking:
-        w.writerow([])
-        w.writerow([f"Lot Tracking (Lots Manufactured Since {lot_min_year})"])
-        w.writerow(["SKU", "Current Lot", "Total Produced", "Total Distributed", "Remaining", "Last Ship"])
-        for row in lot_tracking:
-            w.writerow(
-                [
+        if lot_tracking:
+            yield []
+            yield [f"Lot Tracking (Lots Manufactured Since {lot_min_year})"]
+            yield LOT_TRACKING_CSV_FIELDS
+            for row in lot_tracking:
+                yield (
                     row.get("sku"),
                     row.get("lot"),
                     row.get("total_produced"),
                     row.get("total_distributed"),
                     row.get("remaining"),
                     str(row.get("last_date") or ""),
-                ]
-            )
-
-    from app.eqms.audit import record_event
+                )
 
     record_event(
         s,
@@ -1674,15 +1633,8 @@ def sales_dashboard_export():
     )
     s.commit()
 
-    data_bytes = out.getvalue().encode("utf-8")
     filename = f"sales_dashboard_{start_date.strftime('%Y%m%d')}.csv"
-    return send_file(
-        io.BytesIO(data_bytes),
-        mimetype="text/csv",
-        as_attachment=True,
-        download_name=filename,
-        max_age=0,
-    )
+    return _csv_download(_rows(), filename=filename)
 
 
 # ============================================================================
@@ -1693,7 +1645,6 @@ def sales_dashboard_export():
 @require_permission("sales_orders.view")
 def sales_orders_list():
     """List all sales orders with filters."""
-    from app.eqms.modules.rep_traceability.models import SalesOrder
     
     s = db_session()
     page = int(request.args.get("page") or 1)
@@ -1763,12 +1714,10 @@ def sales_orders_list():
 @require_permission("sales_orders.view")
 def sales_order_detail(order_id: int):
     """View sales order detail with lines and distributions."""
-    from app.eqms.modules.rep_traceability.models import SalesOrder, OrderPdfAttachment
     
     s = db_session()
     order = s.get(SalesOrder, order_id)
     if not order:
-        from flask import abort
         abort(404)
     
     # Get distributions linked to this order
@@ -1797,8 +1746,6 @@ def sales_order_detail(order_id: int):
 @bp.post("/sales-orders/<int:order_id>/upload-pdf")
 @require_permission("sales_orders.edit")
 def sales_order_upload_pdf(order_id: int):
-    from app.eqms.modules.rep_traceability.models import SalesOrder
-
     s = db_session()
     u = _current_user()
     order = s.get(SalesOrder, order_id)
@@ -1828,16 +1775,13 @@ def sales_order_upload_pdf(order_id: int):
 @bp.get("/sales-orders/pdf/<int:attachment_id>/download")
 @require_permission("sales_orders.view")
 def sales_order_pdf_download(attachment_id: int):
-    from app.eqms.modules.rep_traceability.models import OrderPdfAttachment
-
     s = db_session()
     attachment = s.get(OrderPdfAttachment, attachment_id)
     if not attachment:
-        from flask import abort
         abort(404)
 
     storage = storage_from_config(current_app.config)
-    fh = storage.open(attachment.storage_key)
+    fh = storage.download_source(attachment.storage_key)
     return send_file(
         fh,
         download_name=attachment.filename,
@@ -1858,8 +1802,6 @@ def sales_orders_import_pdf_bulk():
     - 10MB per file
     - 50MB total across all files
     """
-    from app.eqms.modules.rep_traceability.models import SalesOrder, SalesOrderLine
-    from datetime import datetime
     
     s = db_session()
     u = _current_user()
@@ -1877,7 +1819,7 @@ def sales_orders_import_pdf_bulk():
             split_pdf_into_pages,
         )
     except ImportError as e:
-        logger.error(f"PDF dependencies missing: {e}", exc_info=True)
+        logger.error("PDF dependencies missing: %s", e, exc_info=True)
         flash("PDF parsing libraries are not installed. Please contact support.", "danger")
         return redirect(url_for("rep_traceability.sales_orders_import_pdf_get"))
     
@@ -1904,7 +1846,11 @@ def sales_orders_import_pdf_bulk():
         flash(f"Total upload size ({total_upload_size / 1024 / 1024:.1f}MB) exceeds maximum ({MAX_TOTAL_SIZE / 1024 / 1024:.0f}MB).", "danger")
         return redirect(url_for("rep_traceability.sales_orders_import_pdf_get"))
     
-    logger.info(f"Bulk PDF import started: {len([f for f in files if f and f.filename])} files, {total_upload_size / 1024 / 1024:.1f}MB total")
+    logger.info(
+        "Bulk PDF import started: %d files, %.1fMB total",
+        sum(1 for f in files if f and f.filename),
+        total_upload_size / 1024 / 1024,
+    )
 
     total_pages = 0
     total_orders = 0
@@ -1934,14 +1880,14 @@ def sales_orders_import_pdf_bulk():
             try:
                 pdf_bytes = f.read()
             except Exception as e:
-                logger.error(f"Failed to read PDF {original_filename}: {e}", exc_info=True)
+                logger.error("Failed to read PDF %s: %s", original_filename, e, exc_info=True)
                 total_errors += 1
                 continue
             
             # Validate PDF size (10MB limit)
             MAX_PDF_SIZE = 10 * 1024 * 1024  # 10MB
             if len(pdf_bytes) > MAX_PDF_SIZE:
-                logger.warning(f"PDF too large: {original_filename} ({len(pdf_bytes)} bytes)")
+                logger.warning("PDF too large: %s (%d bytes)", original_filename, len(pdf_bytes))
                 # Store as unparsed for manual review
                 try:
                     _store_and_track(
@@ -1954,7 +1900,7 @@ def sales_orders_import_pdf_bulk():
                         user=u,
                     )
                 except Exception as e:
-                    logger.error(f"Storage error storing oversized PDF {original_filename}: {e}")
+                    logger.error("Storage error storing oversized PDF %s: %s", original_filename, e)
                     storage_errors += 1
                 total_errors += 1
                 continue
@@ -1963,7 +1909,7 @@ def sales_orders_import_pdf_bulk():
             try:
                 pages = split_pdf_into_pages(pdf_bytes)
             except Exception as e:
-                logger.error(f"Failed to split PDF {original_filename}: {e}", exc_info=True)
+                logger.error("Failed to split PDF %s: %s", original_filename, e, exc_info=True)
                 # Store as unparsed for manual review
                 try:
                     _store_and_track(
@@ -1976,7 +1922,7 @@ def sales_orders_import_pdf_bulk():
                         user=u,
                     )
                 except Exception as e2:
-                    logger.error(f"Storage error storing unsplit PDF {original_filename}: {e2}")
+                    logger.error("Storage error storing unsplit PDF %s: %s", original_filename, e2)
                     storage_errors += 1
                 total_errors += 1
                 continue
@@ -1988,7 +1934,7 @@ def sales_orders_import_pdf_bulk():
                 try:
                     result = parse_sales_orders_pdf(page_bytes)
                 except Exception as e:
-                    logger.error(f"Failed to parse page {page_num} of {original_filename}: {e}", exc_info=True)
+                    logger.error("Failed to parse page %s of %s: %s", page_num, original_filename, e, exc_info=True)
                     # Store as unmatched for manual review
                     try:
                         _store_and_track(
@@ -2001,7 +1947,7 @@ def sales_orders_import_pdf_bulk():
                             user=u,
                         )
                     except Exception as e2:
-                        logger.error(f"Storage error storing unparsed page {page_num} of {original_filename}: {e2}")
+                        logger.error("Storage error storing unparsed page %s of %s: %s", page_num, original_filename, e2)
                         storage_errors += 1
                     total_unmatched += 1
                     continue
@@ -2066,7 +2012,7 @@ def sales_orders_import_pdf_bulk():
                             contact_email=order_data.get("contact_email"),
                         )
                     except Exception as e:
-                        logger.warning(f"Error creating customer '{customer_name}': {e}")
+                        logger.warning("Error creating customer '%s': %s", customer_name, e)
                         continue
                     
                     # Check if sales order already exists
@@ -2113,7 +2059,6 @@ def sales_orders_import_pdf_bulk():
                     
                     if not is_nre:
                         # Auto-match existing ShipStation distributions to this sales order
-                        from app.eqms.modules.rep_traceability.service import match_distribution_to_sales_order, normalize_order_number
 
                         normalized_order = normalize_order_number(order_number)
                         unmatched_q = (
@@ -2159,7 +2104,6 @@ def sales_orders_import_pdf_bulk():
                         total_lines += 1
         
         # Audit event
-        from app.eqms.audit import record_event
         record_event(
             s,
             actor=u,
@@ -2182,7 +2126,7 @@ def sales_orders_import_pdf_bulk():
         try:
             s.commit()
         except Exception as e:
-            logger.error(f"Database commit failed during bulk PDF import: {e}", exc_info=True)
+            logger.error("Database commit failed during bulk PDF import: %s", e, exc_info=True)
             s.rollback()
             try:
                 storage = storage_from_config(current_app.config)
@@ -2214,11 +2158,17 @@ def sales_orders_import_pdf_bulk():
         elif total_errors > 0 or total_unmatched > 0 or parse_error_messages:
             flash_category = "warning"
         
-        logger.info(f"Bulk PDF import completed: {total_orders} orders, {total_pages} pages, {total_errors} errors, {storage_errors} storage errors")
+        logger.info(
+            "Bulk PDF import completed: %d orders, %d pages, %d errors, %d storage errors",
+            total_orders,
+            total_pages,
+            total_errors,
+            storage_errors,
+        )
         flash(msg, flash_category)
         
     except Exception as e:
-        logger.error(f"Bulk PDF import failed unexpectedly: {e}", exc_info=True)
+        logger.error("Bulk PDF import failed unexpectedly: %s", e, exc_info=True)
         s.rollback()
         flash(f"Import failed: {str(e)}. Please check logs for details.", "danger")
     
@@ -2229,10 +2179,6 @@ def sales_orders_import_pdf_bulk():
 @require_permission("sales_orders.import")
 def shipping_labels_import_bulk():
     """Bulk shipping label PDF import (labels only, no orders created)."""
-    from app.eqms.modules.rep_traceability.parsers.pdf import (
-        parse_sales_orders_pdf,
-        split_pdf_into_pages,
-    )
 
     s = db_session()
     u = _current_user()
@@ -2339,8 +2285,6 @@ def shipping_labels_import_bulk():
                         logger.error("Storage error storing label page %s of %s: %s", page_num, original_filename, e)
                         storage_errors += 1
 
-        from app.eqms.audit import record_event
-
         record_event(
             s,
             actor=u,
@@ -2403,7 +2347,6 @@ def sales_orders_import_pdf_get():
 @require_permission("sales_orders.view")
 def sales_orders_unmatched_pdfs():
     """List unmatched PDF attachments (pages that couldn't be parsed or matched to orders)."""
-    from app.eqms.modules.rep_traceability.models import OrderPdfAttachment
     
     s = db_session()
     
@@ -2436,8 +2379,6 @@ def sales_orders_unmatched_pdfs():
 @require_permission("sales_orders.edit")
 def sales_orders_match_pdf():
     """Manually match an unmatched PDF to a Sales Order or Distribution."""
-    from app.eqms.modules.rep_traceability.models import OrderPdfAttachment, SalesOrder
-    from app.eqms.modules.rep_traceability.service import normalize_order_number
 
     s = db_session()
     attachment_id = request.form.get("attachment_id")
@@ -2511,8 +2452,6 @@ def sales_orders_import_pdf_post():
     except ImportError:
         flash("PDF parsing libraries are not installed. Please contact support.", "danger")
         return redirect(url_for("rep_traceability.sales_orders_import_pdf_get"))
-    from app.eqms.modules.rep_traceability.models import SalesOrder, SalesOrderLine
-    from datetime import datetime
     
     s = db_session()
     u = _current_user()
@@ -2606,7 +2545,7 @@ def sales_orders_import_pdf_post():
                     contact_email=order_data.get("contact_email"),
                 )
             except Exception as e:
-                current_app.logger.warning(f"Error creating customer '{customer_name}': {e}")
+                current_app.logger.warning("Error creating customer '%s': %s", customer_name, e)
                 continue
             
             # Check if sales order already exists
@@ -2655,7 +2594,6 @@ def sales_orders_import_pdf_post():
             
             if not is_nre:
                 # Auto-match existing ShipStation distributions to this sales order
-                from app.eqms.modules.rep_traceability.service import match_distribution_to_sales_order, normalize_order_number
 
                 normalized_order = normalize_order_number(order_number)
                 unmatched_q = (
@@ -2701,7 +2639,6 @@ def sales_orders_import_pdf_post():
                 created_lines += 1
     
     # Audit event
-    from app.eqms.audit import record_event
 
     record_event(
         s,
@@ -2757,8 +2694,6 @@ def sales_orders_import_pdf_post():
 @require_permission("sales_dashboard.view")
 def sales_dashboard_order_details(order_number: str):
     """Return JSON with order details for dropdown."""
-    from flask import jsonify
-    from app.eqms.modules.rep_traceability.models import SalesOrder, SalesOrderLine, OrderPdfAttachment
     
     s = db_session()
     
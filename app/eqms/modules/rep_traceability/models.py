@@ -182,7 +182,7 @@ class DistributionLogEntry(Base):
         ),
         # Indexes for filtering/search
         Index("idx_distribution_log_ship_date", "ship_date"),
-        Index("idx_distribution_log_source", "source"),
+        Index("idx_distribution_log_source_ship_date", "source", "ship_date"),
         Index("idx_distribution_log_rep_id", "rep_id"),
         Index("idx_distribution_log_sku", "sku"),
         Index("idx_distribution_log_order_number", "order_number"),
@@ -281,8 +281,7 @@ class TracingReport(Base):
 class ApprovalEml(Base):
     __tablename__ = "approvals_eml"
     __table_args__ = (
-        Index("idx_approvals_eml_report_id", "report_id"),
-        Index("idx_approvals_eml_uploaded_at", "uploaded_at"),
+        Index("idx_approvals_eml_report_id_uploaded_at", "report_id", "uploaded_at"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -50,8 +50,8 @@ def parse_distribution_csv(file_bytes: bytes) -> tuple[list[dict], list[CsvRowEr
       (rows, errors)
     Where each row is a dict suitable for service.create_distribution_entry().
     """
-    text = file_bytes.decode("utf-8-sig", errors="replace")
-    f = io.StringIO(text)
+    # Decode incrementally while reading instead of materializing a second full-size str copy.
+    f = io.TextIOWrapper(io.BytesIO(file_bytes), encoding="utf-8-sig", errors="replace", newline="")
     reader = csv.DictReader(f)
     if not reader.fieldnames:
         raise ValueError("CSV has no header row.")
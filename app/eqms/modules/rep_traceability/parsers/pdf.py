@@ -16,12 +16,13 @@ import re
 import logging
 from dataclasses import dataclass
 from datetime import date
-from typing import Any
+from typing import Any, BinaryIO
 
 logger = logging.getLogger(__name__)
 
 
-def _extract_text(pdf_bytes: bytes) -> str:
+def _extract_text(pdf_source: bytes | BinaryIO) -> str:
+    """Text of every page. Accepts bytes or a binary file; seekable files are parsed in place, unbuffered."""
     try:
         import pdfplumber
     except Exception as e:
@@ -30,9 +31,17 @@ def _extract_text(pdf_bytes: bytes) -> str:
 
     from io import BytesIO
 
+    if isinstance(pdf_source, (bytes, bytearray)):
+        stream: BinaryIO = BytesIO(pdf_source)
+    elif getattr(pdf_source, "seekable", lambda: False)():
+        stream = pdf_source
+    else:
+        # pdfplumber needs random access; buffer non-seekable streams (e.g. S3 bodies).
+        stream = BytesIO(pdf_source.read())
+
     text = []
     try:
-        with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
+        with pdfplumber.open(stream) as pdf:
             for page in pdf.pages:
                 text.append(page.extract_text() or "")
     except Exception as e:
@@ -73,6 +82,9 @@ class ParseResult:
 from app.eqms.constants import ITEM_CODE_TO_SKU, VALID_SKUS
 SKIP_ITEM_CODES = {'NRE', 'SLQ-4007', 'IFU'}
 MAX_REASONABLE_QUANTITY = 50000
+_CITY_STATE_ZIP_RE = re.compile(
+    r"^([A-Za-z\s\.]+)[,\s]+([A-Z]{2})\s+(\d{5}(?:-\d{4})?)(?:\s+[A-Z]{2})?$"
+)
 
 
 def _normalize_sku(raw_sku: str, item_description: str = "") -> str | None:
@@ -223,11 +235,8 @@ def _parse_ship_to_block(text: str) -> dict[str, str | None]:
             result["ship_to_address1"] = line
             break
 
-    city_state_zip_pattern = re.compile(
-        r"^([A-Za-z\s\.]+)[,\s]+([A-Z]{2})\s+(\d{5}(?:-\d{4})?)(?:\s+[A-Z]{2})?$"
-    )
     for line in lines:
-        match = city_state_zip_pattern.match(line)
+        match = _CITY_STATE_ZIP_RE.match(line)
         if match:
             result["ship_to_city"] = match.group(1).strip()
             result["ship_to_state"] = match.group(2)
@@ -306,11 +315,8 @@ def _parse_bill_to_block(text: str) -> dict[str, str | None]:
             result["bill_to_address1"] = line
             break
 
-    city_state_zip_pattern = re.compile(
-        r"^([A-Za-z\s\.]+)[,\s]+([A-Z]{2})\s+(\d{5}(?:-\d{4})?)(?:\s+[A-Z]{2})?$"
-    )
     for line in lines:
-        match = city_state_zip_pattern.match(line)
+        match = _CITY_STATE_ZIP_RE.match(line)
         if match:
             result["bill_to_city"] = match.group(1).strip()
             result["bill_to_state"] = match.group(2)
@@ -561,7 +567,7 @@ def parse_sales_orders_pdf(file_bytes: bytes) -> ParseResult:
                     continue
                 errors.append(ParseError(row_index=page_num, message=f"Page {page_num}: Unknown format.", raw_data=text[:200]))
     except Exception as e:
-        logger.error(f"PDF parse error: {e}", exc_info=True)
+        logger.error("PDF parse error: %s", e, exc_info=True)
         errors.append(ParseError(row_index=None, message=f"Failed to open PDF: {e}"))
     return ParseResult(orders=orders, lines=lines, labels=labels, errors=errors, total_rows_processed=total_pages)
 
@@ -11,6 +11,7 @@ from datetime import date, datetime, timezone
 from email.parser import BytesParser
 from email.policy import default as email_policy_default
 from email.utils import getaddresses, parsedate_to_datetime
+from operator import itemgetter
 from typing import Any
 
 from werkzeug.utils import secure_filename
@@ -448,6 +449,26 @@ def _json_dumps_sorted(d: dict[str, Any]) -> str:
     return json.dumps(d, sort_keys=True, separators=(",", ":"))
 
 
+# Column order shared by the distribution log export and tracing report CSVs
+DISTRIBUTION_CSV_FIELDS = ("Ship Date", "Order #", "Facility", "City", "State", "SKU", "Lot", "Quantity", "Rep", "Source")
+
+
+def distribution_csv_row(e: DistributionLogEntry) -> tuple[Any, ...]:
+    """One CSV row for `e`, in DISTRIBUTION_CSV_FIELDS order."""
+    return (
+        str(e.ship_date),
+        e.order_number,
+        e.customer.facility_name if getattr(e, "customer", None) else e.facility_name,
+        e.city or "",
+        e.state or "",
+        e.sku,
+        e.lot_number,
+        e.quantity,
+        e.rep_name or (str(e.rep_id) if e.rep_id else ""),
+        e.source,
+    )
+
+
 def _sha256_bytes(b: bytes) -> str:
     h = hashlib.sha256()
     h.update(b)
@@ -506,27 +527,14 @@ def generate_tracing_report_csv(s, *, user: User, filters: dict[str, Any], app_c
 
     entries = q.order_by(DistributionLogEntry.ship_date.asc(), DistributionLogEntry.order_number.asc()).all()
 
-    out = io.StringIO()
+    # Encode straight into a bytes buffer (no intermediate str of the whole report to re-encode).
+    raw = io.BytesIO()
+    out = io.TextIOWrapper(raw, encoding="utf-8", newline="")
     w = csv.writer(out)
-    w.writerow(["Ship Date", "Order #", "Facility", "City", "State", "SKU", "Lot", "Quantity", "Rep", "Source"])
-    for e in entries:
-        facility = e.customer.facility_name if getattr(e, "customer", None) else e.facility_name
-        w.writerow(
-            [
-                str(e.ship_date),
-                e.order_number,
-                facility,
-                e.city or "",
-                e.state or "",
-                e.sku,
-                e.lot_number,
-                e.quantity,
-                e.rep_name or (str(e.rep_id) if e.rep_id else ""),
-                e.source,
-            ]
-        )
-
-    csv_bytes = out.getvalue().encode("utf-8")
+    w.writerow(DISTRIBUTION_CSV_FIELDS)
+    w.writerows(map(distribution_csv_row, entries))
+    out.flush()
+    csv_bytes = raw.getvalue()
     sha256 = _sha256_bytes(csv_bytes)
     row_count = len(entries)
 
@@ -674,11 +682,16 @@ def compute_sales_dashboard(s, *, start_date: date | None) -> dict[str, Any]:
         base = (facility_name or customer_name or "").strip()
         return f"k:{canonical_customer_key(base)}"
 
+    customer_orders = orders_by_customer.setdefault
     for customer_id, facility_name, customer_name, order_number in lifetime_rows:
         key = _customer_key(customer_id, facility_name, customer_name)
         if key == "k:":
             continue
-        orders_by_customer.setdefault(key, set()).add(order_number or "")
+        customer_orders(key, set()).add(order_number or "")
+    # Distinct non-empty order numbers per customer key, computed once for every consumer below
+    lifetime_order_counts = {
+        key: len(orders) - ("" in orders) for key, orders in orders_by_customer.items()
+    }
 
     # Windowed entries - ONLY MATCHED DISTRIBUTIONS
     q = s.query(DistributionLogEntry).filter(
@@ -688,70 +701,19 @@ def compute_sales_dashboard(s, *, start_date: date | None) -> dict[str, Any]:
         q = q.filter(DistributionLogEntry.ship_date >= start_date)
     window_entries = q.order_by(DistributionLogEntry.ship_date.asc(), DistributionLogEntry.id.asc()).all()
 
-    total_orders = len({e.order_number for e in window_entries if e.order_number})
-
     from sqlalchemy import func
-    if start_date:
-        line_window_total = int(
-            s.query(func.coalesce(func.sum(DistributionLine.quantity), 0))
-            .join(DistributionLogEntry, DistributionLogEntry.id == DistributionLine.distribution_entry_id)
-            .filter(
-                DistributionLogEntry.sales_order_id.isnot(None),
-                DistributionLogEntry.ship_date >= start_date,
-            )
-            .scalar() or 0
-        )
-        line_entry_ids_window = {
-            row[0]
-            for row in (
-                s.query(DistributionLine.distribution_entry_id)
-                .join(DistributionLogEntry, DistributionLogEntry.id == DistributionLine.distribution_entry_id)
-                .filter(
-                    DistributionLogEntry.sales_order_id.isnot(None),
-                    DistributionLogEntry.ship_date >= start_date,
-                )
-                .distinct()
-                .all()
-            )
-        }
-    else:
-        line_window_total = int(
-            s.query(func.coalesce(func.sum(DistributionLine.quantity), 0))
-            .join(DistributionLogEntry, DistributionLogEntry.id == DistributionLine.distribution_entry_id)
-            .filter(DistributionLogEntry.sales_order_id.isnot(None))
-            .scalar() or 0
-        )
-        line_entry_ids_window = {
-            row[0]
-            for row in (
-                s.query(DistributionLine.distribution_entry_id)
-                .join(DistributionLogEntry, DistributionLogEntry.id == DistributionLine.distribution_entry_id)
-                .filter(DistributionLogEntry.sales_order_id.isnot(None))
-                .distinct()
-                .all()
-            )
-        }
-    missing_window_units = sum(
-        int(e.quantity or 0) for e in window_entries if e.id not in line_entry_ids_window
+    matched_lines = (
+        s.query(DistributionLine)
+        .join(DistributionLogEntry, DistributionLogEntry.id == DistributionLine.distribution_entry_id)
+        .filter(DistributionLogEntry.sales_order_id.isnot(None))
     )
-    total_units_window = line_window_total + missing_window_units
 
     # All-time total units (ignores start_date window) - ONLY MATCHED
     line_units_all_time = int(
-        s.query(func.coalesce(func.sum(DistributionLine.quantity), 0))
-        .join(DistributionLogEntry, DistributionLogEntry.id == DistributionLine.distribution_entry_id)
-        .filter(DistributionLogEntry.sales_order_id.isnot(None))
-        .scalar() or 0
+        matched_lines.with_entities(func.coalesce(func.sum(DistributionLine.quantity), 0)).scalar() or 0
     )
     line_entry_ids_all = {
-        row[0]
-        for row in (
-            s.query(DistributionLine.distribution_entry_id)
-            .join(DistributionLogEntry, DistributionLogEntry.id == DistributionLine.distribution_entry_id)
-            .filter(DistributionLogEntry.sales_order_id.isnot(None))
-            .distinct()
-            .all()
-        )
+        row[0] for row in matched_lines.with_entities(DistributionLine.distribution_entry_id).distinct().all()
     }
     missing_units_query = (
         s.query(func.coalesce(func.sum(DistributionLogEntry.quantity), 0))
@@ -762,16 +724,45 @@ def compute_sales_dashboard(s, *, start_date: date | None) -> dict[str, Any]:
     missing_all_units = int(missing_units_query.scalar() or 0)
     total_units_all_time = line_units_all_time + missing_all_units
 
-    window_customer_keys = [
-        _customer_key(e.customer_id, e.facility_name, e.customer_name) for e in window_entries if _customer_key(e.customer_id, e.facility_name, e.customer_name) != "k:"
-    ]
-    total_customers = len(set(window_customer_keys))
+    # Without a window the windowed line aggregates are identical to the all-time ones.
+    if start_date:
+        matched_lines_window = matched_lines.filter(DistributionLogEntry.ship_date >= start_date)
+        line_window_total = int(
+            matched_lines_window.with_entities(func.coalesce(func.sum(DistributionLine.quantity), 0)).scalar() or 0
+        )
+        line_entry_ids_window = {
+            row[0]
+            for row in matched_lines_window.with_entities(DistributionLine.distribution_entry_id).distinct().all()
+        }
+    else:
+        line_window_total = line_units_all_time
+        line_entry_ids_window = line_entry_ids_all
+
+    # Single pass over the window: distinct orders, customer keys, and units of entries without lines
+    window_order_numbers: set[str] = set()
+    window_customer_keys: set[str] = set()
+    add_order = window_order_numbers.add
+    add_key = window_customer_keys.add
+    missing_window_units = 0
+    missing_window_sku_units: dict[str, int] = {}
+    for e in window_entries:
+        if e.order_number:
+            add_order(e.order_number)
+        key = _customer_key(e.customer_id, e.facility_name, e.customer_name)
+        if key != "k:":
+            add_key(key)
+        if e.id not in line_entry_ids_window:
+            qty = int(e.quantity or 0)
+            missing_window_units += qty
+            missing_window_sku_units[e.sku] = missing_window_sku_units.get(e.sku, 0) + qty
+    total_orders = len(window_order_numbers)
+    total_units_window = line_window_total + missing_window_units
+    total_customers = len(window_customer_keys)
 
     first_time = 0
     repeat = 0
-    for key in set(window_customer_keys):
-        lifetime_orders = len({o for o in orders_by_customer.get(key, set()) if o})
-        if lifetime_orders <= 1:
+    for key in window_customer_keys:
+        if lifetime_order_counts.get(key, 0) <= 1:
             first_time += 1
         else:
             repeat += 1
@@ -788,11 +779,9 @@ def compute_sales_dashboard(s, *, start_date: date | None) -> dict[str, Any]:
     for sku, units in sku_rows:
         if sku:
             sku_totals[sku] = int(units or 0)
-    for e in window_entries:
-        if e.id in line_entry_ids_window:
-            continue
-        sku_totals[e.sku] = sku_totals.get(e.sku, 0) + int(e.quantity or 0)
-    sku_breakdown = [{"sku": sku, "units": units} for sku, units in sorted(sku_totals.items(), key=lambda kv: kv[0])]
+    for sku, units in missing_window_sku_units.items():
+        sku_totals[sku] = sku_totals.get(sku, 0) + units
+    sku_breakdown = [{"sku": sku, "units": units} for sku, units in sorted(sku_totals.items(), key=itemgetter(0))]
 
     entry_line_totals: dict[int, int] = {}
     entry_line_rows = (
@@ -837,9 +826,16 @@ def compute_sales_dashboard(s, *, start_date: date | None) -> dict[str, Any]:
     sku_latest_lot: dict[str, str] = {}
     sku_last_date: dict[str, date] = {}
 
+    # Bound lookups shared by the two per-row lot loops below
+    corrected_lot_for = lot_corrections.get
+    lot_year_for = lot_years.get
+    sku_for_lot = lot_to_sku.get
+    distributed_for = sku_total_distributed.get
+
     # Query all distribution lines with lots - ONLY MATCHED DISTRIBUTIONS
+    # (only the columns used below, so no ORM entities or their selectin relationships are loaded)
     all_lines = (
-        s.query(DistributionLine, DistributionLogEntry)
+        s.query(DistributionLine.lot_number, DistributionLine.sku, DistributionLine.quantity, DistributionLogEntry.ship_date)
         .join(DistributionLogEntry, DistributionLogEntry.id == DistributionLine.distribution_entry_id)
         .filter(
             DistributionLogEntry.sales_order_id.isnot(None),
@@ -849,31 +845,36 @@ def compute_sales_dashboard(s, *, start_date: date | None) -> dict[str, Any]:
         .all()
     )
 
-    for line, entry in all_lines:
-        raw_lot = (line.lot_number or "").strip()
+    for line_lot, line_sku, line_quantity, ship_date in all_lines:
+        raw_lot = (line_lot or "").strip()
         if not raw_lot:
             continue
 
         normalized_lot = normalize_lot(raw_lot)
-        corrected_lot = lot_corrections.get(normalized_lot, normalized_lot)
+        corrected_lot = corrected_lot_for(normalized_lot, normalized_lot)
 
-        lot_year = lot_years.get(corrected_lot)
+        lot_year = lot_year_for(corrected_lot)
         if lot_year is None or lot_year < min_year:
             continue
 
-        sku = lot_to_sku.get(corrected_lot) or lot_to_sku.get(normalized_lot) or line.sku
+        sku = sku_for_lot(corrected_lot) or sku_for_lot(normalized_lot) or line_sku
         if not sku or sku not in VALID_SKUS:
             continue
 
-        sku_total_distributed[sku] = sku_total_distributed.get(sku, 0) + int(line.quantity or 0)
+        sku_total_distributed[sku] = distributed_for(sku, 0) + int(line_quantity or 0)
 
-        if sku not in sku_latest_lot or (entry.ship_date and entry.ship_date > sku_last_date.get(sku, date.min)):
+        if sku not in sku_latest_lot or (ship_date and ship_date > sku_last_date.get(sku, date.min)):
             sku_latest_lot[sku] = corrected_lot
-            sku_last_date[sku] = entry.ship_date
+            sku_last_date[sku] = ship_date
 
     if line_entry_ids_all:
         entry_fallbacks = (
-            s.query(DistributionLogEntry)
+            s.query(
+                DistributionLogEntry.lot_number,
+                DistributionLogEntry.sku,
+                DistributionLogEntry.quantity,
+                DistributionLogEntry.ship_date,
+            )
             .filter(
                 DistributionLogEntry.sales_order_id.isnot(None),
                 DistributionLogEntry.lot_number.isnot(None),
@@ -882,26 +883,26 @@ def compute_sales_dashboard(s, *, start_date: date | None) -> dict[str, Any]:
             .order_by(DistributionLogEntry.ship_date.desc(), DistributionLogEntry.id.desc())
             .all()
         )
-        for e in entry_fallbacks:
-            raw_lot = (e.lot_number or "").strip()
+        for entry_lot, entry_sku, entry_quantity, ship_date in entry_fallbacks:
+            raw_lot = (entry_lot or "").strip()
             if not raw_lot:
                 continue
             normalized_lot = normalize_lot(raw_lot)
-            corrected_lot = lot_corrections.get(normalized_lot, normalized_lot)
+            corrected_lot = corrected_lot_for(normalized_lot, normalized_lot)
 
-            lot_year = lot_years.get(corrected_lot)
+            lot_year = lot_year_for(corrected_lot)
             if lot_year is None or lot_year < min_year:
                 continue
 
-            sku = lot_to_sku.get(corrected_lot) or lot_to_sku.get(normalized_lot) or e.sku
+            sku = sku_for_lot(corrected_lot) or sku_for_lot(normalized_lot) or entry_sku
             if not sku or sku not in VALID_SKUS:
                 continue
 
-            sku_total_distributed[sku] = sku_total_distributed.get(sku, 0) + int(e.quantity or 0)
+            sku_total_distributed[sku] = distributed_for(sku, 0) + int(entry_quantity or 0)
 
-            if sku not in sku_latest_lot or (e.ship_date and e.ship_date > sku_last_date.get(sku, date.min)):
+            if sku not in sku_latest_lot or (ship_date and ship_date > sku_last_date.get(sku, date.min)):
                 sku_latest_lot[sku] = corrected_lot
-                sku_last_date[sku] = e.ship_date
+                sku_last_date[sku] = ship_date
 
     # Find most recent lot per SKU from LotLog (fallback if no 2025+ lots)
     sku_most_recent_lot: dict[str, tuple[str, int, int]] = {}
@@ -943,7 +944,7 @@ def compute_sales_dashboard(s, *, start_date: date | None) -> dict[str, Any]:
             }
         )
 
-    lot_tracking = sorted(lot_tracking, key=lambda x: x["sku"], reverse=True)
+    lot_tracking = sorted(lot_tracking, key=itemgetter("sku"), reverse=True)
 
     # Recent orders from NEW customers (first-time = 1 lifetime order)
     # Recent orders from REPEAT customers (2+ lifetime orders)
@@ -956,31 +957,32 @@ def compute_sales_dashboard(s, *, start_date: date | None) -> dict[str, Any]:
         # Skip if not matched to Sales Order
         if not e.order_number or not e.customer_id or not e.sales_order_id:
             continue
-        if e.order_number not in orders_by_order_number:
-            orders_by_order_number[e.order_number] = {
+        order = orders_by_order_number.get(e.order_number)
+        if order is None:
+            order = orders_by_order_number[e.order_number] = {
                 "order_number": e.order_number,
                 "ship_date": e.ship_date,
                 "customer_id": e.customer_id,
                 "facility_name": e.facility_name or e.customer_name or "",
                 "total_units": 0,
             }
-        orders_by_order_number[e.order_number]["total_units"] += entry_line_totals.get(e.id, int(e.quantity or 0))
+        order["total_units"] += entry_line_totals.get(e.id, int(e.quantity or 0))
         # Use latest ship_date if there are multiple entries
-        if e.ship_date and e.ship_date > orders_by_order_number[e.order_number]["ship_date"]:
-            orders_by_order_number[e.order_number]["ship_date"] = e.ship_date
+        if e.ship_date and e.ship_date > order["ship_date"]:
+            order["ship_date"] = e.ship_date
     
     # Classify orders by customer type (NEW vs REPEAT)
     for order_data in sorted(orders_by_order_number.values(), key=lambda o: (o["ship_date"] or date.min, o["order_number"]), reverse=True):
         cid = order_data["customer_id"]
         customer_key = f"id:{cid}"
-        lifetime_order_count = len({o for o in orders_by_customer.get(customer_key, set()) if o})
-        
-        if lifetime_order_count <= 1:
+        if lifetime_order_counts.get(customer_key, 0) <= 1:
             if len(recent_orders_new) < 20:
                 recent_orders_new.append(order_data)
         else:
             if len(recent_orders_repeat) < 20:
                 recent_orders_repeat.append(order_data)
+        if len(recent_orders_new) >= 20 and len(recent_orders_repeat) >= 20:
+            break
 
     # Attach note counts for dashboard visibility
     from app.eqms.modules.customer_profiles.models import CustomerNote
@@ -1017,6 +1019,7 @@ def compute_sales_dashboard(s, *, start_date: date | None) -> dict[str, Any]:
         "window_entries": window_entries,
         "customer_key_fn": _customer_key,
         "orders_by_customer": orders_by_customer,
+        "lifetime_order_counts": lifetime_order_counts,
     }
 
 
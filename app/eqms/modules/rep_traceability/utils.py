@@ -12,6 +12,8 @@ from app.eqms.constants import VALID_SKUS
 VALID_SOURCES = ("shipstation", "manual", "csv_import", "pdf_import")
 
 LOT_RE = re.compile(r"^SLQ-\d{5,12}$")  # Allow 5-12 digits (e.g., SLQ-05012025, SLQ-81020515241)
+MONTH_RE = re.compile(r"\d{4}-\d{2}")
+INT_RE = re.compile(r"[+-]?\d+")  # Pre-check so malformed query args never hit int()'s exception path
 
 
 def normalize_text(s: str | None) -> str:
@@ -68,7 +70,7 @@ def validate_ship_date(d: date) -> bool:
 
 def month_bounds(month: str) -> tuple[date, date]:
     m = normalize_text(month)
-    if not re.fullmatch(r"\d{4}-\d{2}", m):
+    if not MONTH_RE.fullmatch(m):
         raise ValueError("month must be YYYY-MM")
     y = int(m[:4])
     mo = int(m[5:7])
@@ -101,7 +103,7 @@ def sanitize_subject_for_filename(subject: str | None) -> str:
 
 def parse_int(s: str | None) -> int | None:
     s = normalize_text(s)
-    if not s:
+    if not s or not INT_RE.fullmatch(s):
         return None
     try:
         return int(s)
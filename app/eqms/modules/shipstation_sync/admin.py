@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import os
+from itertools import islice
 
 from flask import Blueprint, flash, g, redirect, render_template, request, url_for
 from sqlalchemy import func
@@ -9,6 +10,7 @@ from sqlalchemy import func
 from app.eqms.db import db_session
 from app.eqms.models import User
 from app.eqms.modules.rep_traceability.models import DistributionLogEntry
+from app.eqms.modules.shipstation_sync.config import load_shipstation_settings
 from app.eqms.modules.shipstation_sync.models import ShipStationSkippedOrder, ShipStationSyncRun
 from app.eqms.modules.shipstation_sync.service import run_sync
 from app.eqms.modules.shipstation_sync.parsers import canonicalize_sku, load_lot_log
@@ -70,20 +72,19 @@ def _get_top_skip_reasons(s, limit: int = 10) -> list[tuple[str, int]]:
 
 def _get_sync_config() -> dict:
     """Get current sync configuration from environment."""
-    since_date = (os.environ.get("SHIPSTATION_SINCE_DATE") or "").strip()
+    settings = load_shipstation_settings()
+    since_date = settings.since_date
     if not since_date:
         # Dynamic default: start of current year (P3-2 improvement)
         from datetime import date
         current_year = date.today().year
         since_date = f"{current_year}-01-01"
-    max_pages = int((os.environ.get("SHIPSTATION_MAX_PAGES") or "50").strip() or "50")
-    max_orders = int((os.environ.get("SHIPSTATION_MAX_ORDERS") or "500").strip() or "500")
     return {
         "since_date": since_date,
-        "max_pages": max_pages,
-        "max_orders": max_orders,
-        "api_key_set": bool((os.environ.get("SHIPSTATION_API_KEY") or "").strip()),
-        "api_secret_set": bool((os.environ.get("SHIPSTATION_API_SECRET") or "").strip()),
+        "max_pages": settings.max_pages,
+        "max_orders": settings.max_orders,
+        "api_key_set": bool(settings.api_key),
+        "api_secret_set": bool(settings.api_secret),
     }
 
 
@@ -109,8 +110,7 @@ def shipstation_index():
     last_run = runs[0] if runs else None
     limit_warning = last_run and "LIMIT REACHED" in (last_run.message or "")
     
-    env = os.environ.get("ENV", "development").lower()
-    diag_enabled = env != "production" or (os.environ.get("SHIPSTATION_DIAG_ENABLED", "").strip() == "1")
+    diag_enabled = load_shipstation_settings().diag_enabled
 
     return render_template(
         "admin/shipstation/index.html",
@@ -175,10 +175,8 @@ def shipstation_run():
 @require_permission("shipstation.view")
 def shipstation_diag():
     """Diagnostic: show raw ShipStation data and parsing results without syncing."""
-    # Disable in production unless SHIPSTATION_DIAG_ENABLED=1
-    env = os.environ.get("ENV", "development").lower()
-    diag_enabled = os.environ.get("SHIPSTATION_DIAG_ENABLED", "").strip() == "1"
-    if env == "production" and not diag_enabled:
+    settings = load_shipstation_settings()
+    if not settings.diag_enabled:
         flash("Diagnostics disabled in production. Set SHIPSTATION_DIAG_ENABLED=1 to enable.", "danger")
         return redirect(url_for("shipstation_sync.shipstation_index"))
     
@@ -186,16 +184,9 @@ def shipstation_diag():
     from app.eqms.modules.shipstation_sync.shipstation_client import ShipStationClient
     from app.eqms.modules.shipstation_sync.parsers import extract_lot, normalize_lot, infer_units
     
-    api_key = (os.environ.get("SHIPSTATION_API_KEY") or "").strip()
-    api_secret = (os.environ.get("SHIPSTATION_API_SECRET") or "").strip()
-    from pathlib import Path
-
-    lotlog_env = (os.environ.get("SHIPSTATION_LOTLOG_PATH") or os.environ.get("LotLog_Path") or "").strip()
-    if lotlog_env:
-        lotlog_path = lotlog_env
-    else:
-        project_root = Path(__file__).resolve().parents[4]
-        lotlog_path = str(project_root / "app" / "eqms" / "data" / "LotLog.csv")
+    api_key = settings.api_key
+    api_secret = settings.api_secret
+    lotlog_path = settings.lotlog_path
     
     diag_info = {
         "api_key_set": bool(api_key),
@@ -208,14 +199,14 @@ def shipstation_diag():
         "error": None,
     }
     
-    # Load LotLog sample
+    # Load LotLog sample (load_lot_log is cached per file mtime, so diag refreshes don't reparse it)
     try:
         lot_to_sku, lot_corrections = load_lot_log(lotlog_path)
         diag_info["lot_to_sku_count"] = len(lot_to_sku)
         diag_info["lot_corrections_count"] = len(lot_corrections)
         diag_info["lotlog_loaded"] = bool(lot_to_sku)
         # Show first 10 entries
-        diag_info["lot_to_sku_sample"] = dict(list(lot_to_sku.items())[:10])
+        diag_info["lot_to_sku_sample"] = dict(islice(lot_to_sku.items(), 10))
     except Exception as e:
         diag_info["lotlog_error"] = str(e)
     
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from app.eqms.config import _getenv
+
+
+@dataclass(frozen=True)
+class ShipStationSettings:
+    api_key: str
+    api_secret: str
+    lotlog_path: str
+    max_pages: int
+    max_orders: int
+    since_date: str  # raw SHIPSTATION_SINCE_DATE; "" when unset
+    diag_enabled: bool
+
+
+@lru_cache(maxsize=1)
+def load_shipstation_settings() -> ShipStationSettings:
+    """
+    ShipStation settings from the environment, read once per process.
+
+    The environment does not change after startup, so sync runs and admin page loads
+    share this instance instead of re-reading and re-normalising each variable.
+    """
+    lotlog_path = _getenv("SHIPSTATION_LOTLOG_PATH") or _getenv("LotLog_Path")
+    if not lotlog_path:
+        project_root = Path(__file__).resolve().parents[4]
+        lotlog_path = str(project_root / "app" / "eqms" / "data" / "LotLog.csv")
+    return ShipStationSettings(
+        api_key=_getenv("SHIPSTATION_API_KEY"),
+        api_secret=_getenv("SHIPSTATION_API_SECRET"),
+        lotlog_path=lotlog_path,
+        max_pages=int(_getenv("SHIPSTATION_MAX_PAGES", "50") or "50"),
+        max_orders=int(_getenv("SHIPSTATION_MAX_ORDERS", "500") or "500"),
+        since_date=_getenv("SHIPSTATION_SINCE_DATE"),
+        # Disabled in production unless SHIPSTATION_DIAG_ENABLED=1
+        diag_enabled=_getenv("ENV", "development").lower() != "production" or _getenv("SHIPSTATION_DIAG_ENABLED") == "1",
+    )
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
 import csv
+import os
 import re
+import time
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping
 
 from app.eqms.constants import EXCLUDED_SKUS, VALID_SKUS
 
@@ -14,6 +19,10 @@ BARE_LOT_RX = re.compile(r"\b(\d{6,12})\b")
 # Multi-SKU lot pattern: "SKU: 21600101003 LOT: SLQ-05012025"
 SKU_LOT_PAIR_RX = re.compile(r"SKU[:\s]*(\d+)[^A-Z0-9]*LOT[:\s]*([A-Z0-9\-]+)", re.IGNORECASE)
 
+# LotLog.csv is replaced a few times a day at most; remember its stat() briefly
+LOTLOG_STAT_TTL_SECONDS = 30.0
+_lotlog_stat_cache: dict[str, tuple[float, os.stat_result | None]] = {}
+
 
 def canonicalize_sku(raw: str) -> str | None:
     s = (raw or "").upper().strip()
@@ -130,7 +139,22 @@ def infer_units(item_name: str, quantity: int) -> int:
     return qty
 
 
-def load_lot_log(path_str: str) -> tuple[dict[str, str], dict[str, str]]:
+def _lotlog_stat(p: Path) -> os.stat_result | None:
+    """stat() the LotLog file, reusing the result for LOTLOG_STAT_TTL_SECONDS. None if missing."""
+    key = str(p)
+    now = time.monotonic()
+    cached = _lotlog_stat_cache.get(key)
+    if cached is not None and now - cached[0] < LOTLOG_STAT_TTL_SECONDS:
+        return cached[1]
+    try:
+        st: os.stat_result | None = p.stat()
+    except OSError:
+        st = None
+    _lotlog_stat_cache[key] = (now, st)
+    return st
+
+
+def load_lot_log(path_str: str) -> tuple[Mapping[str, str], Mapping[str, str]]:
     """
     Load LotLog.csv mapping:
     - lot_to_sku: {lot_variant -> canonical_sku}
@@ -140,11 +164,19 @@ def load_lot_log(path_str: str) -> tuple[dict[str, str], dict[str, str]]:
     - Normalized lot (SLQ-05012025)
     - Without prefix (05012025)
     - Raw uppercase
+
+    Parsed results are cached per (path, mtime, size) and returned as read-only mappings.
     """
     p = Path(path_str.replace("\\", "/"))  # Handle Windows paths
-    if not p.exists():
-        return {}, {}
-    
+    st = _lotlog_stat(p)
+    if st is None:
+        return MappingProxyType({}), MappingProxyType({})
+    return _parse_lot_log(str(p), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=8)
+def _parse_lot_log(path: str, mtime_ns: int, size: int) -> tuple[Mapping[str, str], Mapping[str, str]]:
+    p = Path(path)
     lot_to_sku: dict[str, str] = {}
     lot_corrections: dict[str, str] = {}
     
@@ -181,21 +213,32 @@ def load_lot_log(path_str: str) -> tuple[dict[str, str], dict[str, str]]:
             if raw_lot.startswith("SLQ-"):
                 lot_to_sku[raw_lot[4:]] = sku
     
-    return lot_to_sku, lot_corrections
+    # Shared by every caller through the cache, so hand out read-only views
+    return MappingProxyType(lot_to_sku), MappingProxyType(lot_corrections)
 
 
-def load_lot_log_with_inventory(path_str: str) -> tuple[dict[str, str], dict[str, str], dict[str, int], dict[str, int]]:
+def load_lot_log_with_inventory(path_str: str) -> tuple[Mapping[str, str], Mapping[str, str], Mapping[str, int], Mapping[str, int]]:
     """
     Load LotLog.csv with inventory data:
     - lot_to_sku: {lot_variant -> canonical_sku}
     - lot_corrections: {raw_lot -> correct_lot}
     - lot_inventory: {canonical_lot -> total_units_produced}
     - lot_years: {canonical_lot -> manufacturing_year}
+
+    Parsed results are cached per (path, mtime, size) and returned as read-only mappings.
     """
     p = Path(path_str.replace("\\", "/"))  # Handle Windows paths
-    if not p.exists():
-        return {}, {}, {}, {}
+    st = _lotlog_stat(p)
+    if st is None:
+        return MappingProxyType({}), MappingProxyType({}), MappingProxyType({}), MappingProxyType({})
+    return _parse_lot_log_with_inventory(str(p), st.st_mtime_ns, st.st_size)
+
 
+@lru_cache(maxsize=8)
+def _parse_lot_log_with_inventory(
+    path: str, mtime_ns: int, size: int
+) -> tuple[Mapping[str, str], Mapping[str, str], Mapping[str, int], Mapping[str, int]]:
+    p = Path(path)
     lot_to_sku: dict[str, str] = {}
     lot_corrections: dict[str, str] = {}
     lot_inventory: dict[str, int] = {}
@@ -280,5 +323,10 @@ def load_lot_log_with_inventory(path_str: str) -> tuple[dict[str, str], dict[str
             if raw_lot.startswith("SLQ-"):
                 lot_to_sku[raw_lot[4:]] = sku
 
-    return lot_to_sku, lot_corrections, lot_inventory, lot_years
+    return (
+        MappingProxyType(lot_to_sku),
+        MappingProxyType(lot_corrections),
+        MappingProxyType(lot_inventory),
+        MappingProxyType(lot_years),
+    )
 
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import json
-import os
 import time
 from datetime import datetime, date as date_type, timezone, timedelta
 from typing import Any
@@ -15,6 +14,7 @@ from app.eqms.modules.customer_profiles.utils import canonical_customer_key
 from app.eqms.modules.customer_profiles.service import find_or_create_customer
 from app.eqms.modules.rep_traceability.models import DistributionLine, DistributionLogEntry, SalesOrder, SalesOrderLine
 from app.eqms.modules.rep_traceability.service import create_distribution_entry
+from app.eqms.modules.shipstation_sync.config import load_shipstation_settings
 from app.eqms.modules.shipstation_sync.models import ShipStationSkippedOrder, ShipStationSyncRun
 from app.eqms.modules.shipstation_sync.parsers import canonicalize_sku, extract_lot, extract_sku_lot_pairs, infer_units, load_lot_log, normalize_lot
 from app.eqms.modules.shipstation_sync.shipstation_client import ShipStationClient, ShipStationError
@@ -141,30 +141,24 @@ def run_sync(
     import logging
     logger = logging.getLogger(__name__)
     
-    api_key = (os.environ.get("SHIPSTATION_API_KEY") or "").strip()
-    api_secret = (os.environ.get("SHIPSTATION_API_SECRET") or "").strip()
+    settings = load_shipstation_settings()
+    api_key = settings.api_key
+    api_secret = settings.api_secret
     if not api_key or not api_secret:
         raise ValueError("SHIPSTATION_API_KEY and SHIPSTATION_API_SECRET are required.")
 
-    from pathlib import Path
-
-    lotlog_env = (os.environ.get("SHIPSTATION_LOTLOG_PATH") or os.environ.get("LotLog_Path") or "").strip()
-    if lotlog_env:
-        lotlog_path = lotlog_env
-    else:
-        project_root = Path(__file__).resolve().parents[4]
-        lotlog_path = str(project_root / "app" / "eqms" / "data" / "LotLog.csv")
+    lotlog_path = settings.lotlog_path
 
     # Hard limits to prevent runaway syncs
     # Increase defaults for better backfill coverage (2025+ orders)
-    max_pages = int((os.environ.get("SHIPSTATION_MAX_PAGES") or "50").strip() or "50")
-    max_orders = int((os.environ.get("SHIPSTATION_MAX_ORDERS") or "500").strip() or "500")
+    max_pages = settings.max_pages
+    max_orders = settings.max_orders
 
     # Determine start date: runtime param > env var > default
     if start_date:
         start_dt = datetime(start_date.year, start_date.month, start_date.day, tzinfo=timezone.utc)
     else:
-        since_date_str = (os.environ.get("SHIPSTATION_SINCE_DATE") or "").strip()
+        since_date_str = settings.since_date
         if since_date_str:
             try:
                 from datetime import date as date_type
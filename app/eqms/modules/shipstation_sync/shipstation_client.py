@@ -24,12 +24,16 @@ class ShipStationClient:
     base_url: str = "https://ssapi.shipstation.com"
     timeout_seconds: int = 60
 
+    def __post_init__(self) -> None:
+        # Normalise once so request_json can concatenate paths directly.
+        object.__setattr__(self, "base_url", self.base_url.rstrip("/"))
+
     def _auth_header(self) -> str:
         token = f"{self.api_key}:{self.api_secret}".encode("utf-8")
         return "Basic " + base64.b64encode(token).decode("ascii")
 
     def request_json(self, path: str, *, params: dict[str, Any] | None = None, retries: int = 3) -> dict[str, Any]:
-        url = self.base_url.rstrip("/") + path
+        url = self.base_url + path
         if params:
             url += "?" + urllib.parse.urlencode({k: v for k, v in params.items() if v is not None})
 
@@ -345,7 +345,7 @@ def supplier_document_download(supplier_id: int, doc_id: int):
         abort(404)
 
     storage = storage_from_config(current_app.config)
-    fobj = storage.open(doc.storage_key)
+    fobj = storage.download_source(doc.storage_key)
 
     record_event(
         s,
@@ -232,7 +232,7 @@ def supplies_document_download(supply_id: int, doc_id: int):
     if not doc or doc.supply_id != supply_id:
         abort(404)
     storage = storage_from_config(current_app.config)
-    fobj = storage.open(doc.storage_key)
+    fobj = storage.download_source(doc.storage_key)
     return send_file(fobj, mimetype=doc.content_type, as_attachment=True, download_name=doc.original_filename)
 
 
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import BinaryIO
+from typing import Any, BinaryIO
 
 
 class StorageError(RuntimeError):
@@ -17,6 +18,10 @@ class Storage:
     def open(self, key: str) -> BinaryIO:
         raise NotImplementedError
 
+    def download_source(self, key: str) -> str | BinaryIO:
+        """Object to hand to send_file(); backends with a real file path return it so X-Sendfile/sendfile(2) apply."""
+        return self.open(key)
+
     def exists(self, key: str) -> bool:
         raise NotImplementedError
 
@@ -44,37 +49,65 @@ class LocalStorage(Storage):
         p = self._path(key)
         return p.open("rb")
 
+    def download_source(self, key: str) -> str:
+        p = self._path(key)
+        if not p.is_file():
+            raise FileNotFoundError(str(p))
+        # Absolute, since Flask resolves relative send_file paths against the app root rather than the cwd
+        return os.path.abspath(p)
+
     def exists(self, key: str) -> bool:
         return self._path(key).exists()
 
     def delete(self, key: str) -> bool:
-        p = self._path(key)
-        if p.exists():
-            p.unlink()
-            return True
-        return False
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            return False
+        return True
 
 
 @dataclass(frozen=True)
 class S3Storage(Storage):
+    """
+    S3-compatible object storage (AWS S3, DigitalOcean Spaces).
+
+    The boto3 client is built on first use and cached on the instance, so the saving only
+    applies to long-lived instances: storage_from_config() still returns a new S3Storage
+    (and so a new client) at each of its call sites.
+    """
+
     endpoint: str
     region: str
     bucket: str
     access_key_id: str
     secret_access_key: str
+    _client_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    # Set once by _client(); the dataclass is frozen, hence object.__setattr__ there.
+    _s3_client: Any = field(default=None, init=False, repr=False, compare=False)
 
     def _client(self):
-        try:
-            import boto3  # type: ignore
-        except Exception as e:  # pragma: no cover
-            raise StorageError("boto3 required for S3 storage. Install boto3.") from e
-        return boto3.client(
-            "s3",
-            endpoint_url=f"https://{self.endpoint}" if self.endpoint else None,
-            region_name=self.region or None,
-            aws_access_key_id=self.access_key_id,
-            aws_secret_access_key=self.secret_access_key,
-        )
+        # boto3 clients are thread-safe once built, but building them off the default
+        # session is not; build one per instance, under a lock, and reuse it.
+        client = self._s3_client
+        if client is not None:
+            return client
+        with self._client_lock:
+            client = self._s3_client
+            if client is None:
+                try:
+                    import boto3  # type: ignore
+                except Exception as e:  # pragma: no cover
+                    raise StorageError("boto3 required for S3 storage. Install boto3.") from e
+                client = boto3.client(
+                    "s3",
+                    endpoint_url=f"https://{self.endpoint}" if self.endpoint else None,
+                    region_name=self.region or None,
+                    aws_access_key_id=self.access_key_id,
+                    aws_secret_access_key=self.secret_access_key,
+                )
+                object.__setattr__(self, "_s3_client", client)
+        return client
 
     def put_bytes(self, key: str, data: bytes, *, content_type: str | None = None) -> None:
         extra: dict[str, object] = {}
@@ -0,0 +1,121 @@
+"""Schema guards shared by more than one migration revision."""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.engine.reflection import Inspector
+
+
+def ensure_external_key(insp: Inspector) -> None:
+    """Add distribution_log_entries.external_key and its (source, external_key) unique index if missing."""
+    if not any(c["name"] == "external_key" for c in insp.get_columns("distribution_log_entries")):
+        with op.batch_alter_table("distribution_log_entries") as batch_op:
+            batch_op.add_column(sa.Column("external_key", sa.Text(), nullable=True))
+
+    if not any(ix.get("name") == "uq_distribution_log_source_external_key" for ix in insp.get_indexes("distribution_log_entries")):
+        op.create_index(
+            "uq_distribution_log_source_external_key",
+            "distribution_log_entries",
+            ["source", "external_key"],
+            unique=True,
+        )
+
+
+def has_column(insp: Inspector, table: str, column: str) -> bool:
+    """True if `table` exists and has `column`; repeat probes hit `insp`'s reflection cache."""
+    if not insp.has_table(table):
+        return False
+    return any(c["name"] == column for c in insp.get_columns(table))
+
+
+def has_index(insp: Inspector, table: str, name: str) -> bool:
+    """True if `table` exists and has an index called `name`; repeat probes hit `insp`'s reflection cache."""
+    if not insp.has_table(table):
+        return False
+    return any(ix.get("name") == name for ix in insp.get_indexes(table))
+
+
+def existing_columns(bind: Connection, table: str) -> set[str] | None:
+    """Column names of `table`, or None if it doesn't exist; one catalog query per probe where possible."""
+    dialect = bind.dialect.name
+    if dialect == "postgresql":
+        oid = bind.execute(sa.text("SELECT CAST(to_regclass(:t) AS oid)"), {"t": table}).scalar()
+        if oid is None:
+            return None
+        rows = bind.execute(
+            sa.text("SELECT attname FROM pg_attribute WHERE attrelid = :oid AND attnum > 0 AND NOT attisdropped"),
+            {"oid": oid},
+        ).scalars()
+        return set(rows)
+    if dialect == "sqlite":
+        # PRAGMA arguments can't be bound; table names here are migration literals.
+        rows = bind.exec_driver_sql(f"PRAGMA table_info({bind.dialect.identifier_preparer.quote(table)})").fetchall()
+        return {r[1] for r in rows} or None
+    insp = inspect(bind)
+    if not insp.has_table(table):
+        return None
+    return {c["name"] for c in insp.get_columns(table)}
+
+
+def table_exists(bind: Connection, table: str) -> bool:
+    """Single-table existence probe, instead of listing every table via get_table_names()."""
+    dialect = bind.dialect.name
+    if dialect == "postgresql":
+        return bool(bind.execute(sa.text("SELECT to_regclass(:t) IS NOT NULL"), {"t": table}).scalar())
+    if dialect == "sqlite":
+        row = bind.execute(
+            sa.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :t"), {"t": table}
+        ).first()
+        return row is not None
+    return inspect(bind).has_table(table)
+
+
+def create_indexes(bind: Connection, table: str, specs: list[tuple[str, list[str], bool]]) -> None:
+    """Create (name, columns, unique) indexes on `table`; on Postgres as one multi-statement round trip."""
+    if not specs:
+        return
+    if bind.dialect.name == "postgresql":
+        op.execute(";\n".join(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} ON {table} ({', '.join(cols)})"
+            for name, cols, unique in specs
+        ))
+    else:
+        # sqlite3 (and most other drivers) only accept one statement per execute.
+        for name, cols, unique in specs:
+            op.create_index(name, table, cols, unique=unique)
+
+
+def create_index_concurrently(bind: Connection, name: str, table: str, columns: list[str], **kw) -> None:
+    """
+    Create index `name` unless a usable one exists; CONCURRENTLY on Postgres, so call it
+    inside op.get_context().autocommit_block().
+
+    An interrupted CREATE INDEX CONCURRENTLY leaves an INVALID index behind under the same
+    name (reflected with dialect_options["postgresql_invalid"]); it is dropped and rebuilt
+    rather than counted as present.
+    """
+    insp = inspect(bind)  # fresh: callers create/drop indexes between probes
+    existing = next((ix for ix in insp.get_indexes(table) if ix.get("name") == name), None)
+    if existing is not None:
+        if not existing.get("dialect_options", {}).get("postgresql_invalid"):
+            return
+        op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    op.create_index(name, table, columns, postgresql_concurrently=True, **kw)
+
+
+def swap_index(table: str, create: list[tuple[str, list[str]]], drop: list[str]) -> None:
+    """
+    Replace the `drop` indexes on `table` with the (name, columns) `create` ones, without
+    blocking writes on Postgres (CONCURRENTLY, in an autocommit block).
+
+    The replacements are built (or an INVALID leftover rebuilt) before anything is dropped,
+    so an interrupted run never leaves the table without a usable index; re-running resumes.
+    """
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        for name, columns in create:
+            create_index_concurrently(bind, name, table, columns)
+        for name in drop:
+            if has_index(inspect(bind), table, name):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
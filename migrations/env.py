@@ -47,6 +47,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
+        transaction_per_migration=True,
     )
 
     with context.begin_transaction():
@@ -73,6 +74,9 @@ def run_migrations_online() -> None:
             target_metadata=target_metadata,
             compare_type=True,
             render_as_batch=connection.dialect.name == "sqlite",
+            # Commit after each revision so a long upgrade chain doesn't hold every
+            # revision's locks until the last one finishes.
+            transaction_per_migration=True,
         )
 
         with context.begin_transaction():
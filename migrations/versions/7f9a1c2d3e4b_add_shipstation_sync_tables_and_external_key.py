@@ -12,6 +12,8 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy import inspect
 
+from migrations._helpers import ensure_external_key
+
 
 # revision identifiers, used by Alembic.
 revision: str = "7f9a1c2d3e4b"
@@ -23,24 +25,14 @@ depends_on: Union[str, Sequence[str], None] = None
 def upgrade() -> None:
     bind = op.get_bind()
     insp = inspect(bind)
+    # One catalog query for table existence, reused by every check below
+    tables = set(insp.get_table_names())
 
     # Distribution Log: add external_key for idempotent ShipStation inserts
-    cols = {c["name"] for c in insp.get_columns("distribution_log_entries")}
-    if "external_key" not in cols:
-        with op.batch_alter_table("distribution_log_entries") as batch_op:
-            batch_op.add_column(sa.Column("external_key", sa.Text(), nullable=True))
-
-    idx_names = {ix.get("name") for ix in insp.get_indexes("distribution_log_entries")}
-    if "uq_distribution_log_source_external_key" not in idx_names:
-        op.create_index(
-            "uq_distribution_log_source_external_key",
-            "distribution_log_entries",
-            ["source", "external_key"],
-            unique=True,
-        )
+    ensure_external_key(insp)
 
     # ShipStation sync run tracking
-    if not insp.has_table("shipstation_sync_runs"):
+    if "shipstation_sync_runs" not in tables:
         op.create_table(
             "shipstation_sync_runs",
             sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
@@ -53,7 +45,7 @@ def upgrade() -> None:
             sa.Column("message", sa.Text(), nullable=True),
         )
 
-    if not insp.has_table("shipstation_skipped_orders"):
+    if "shipstation_skipped_orders" not in tables:
         op.create_table(
             "shipstation_skipped_orders",
             sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
@@ -68,18 +60,18 @@ def upgrade() -> None:
 def downgrade() -> None:
     bind = op.get_bind()
     insp = inspect(bind)
+    # One catalog query for table existence, reused by every check below
+    tables = set(insp.get_table_names())
 
-    if insp.has_table("shipstation_skipped_orders"):
+    if "shipstation_skipped_orders" in tables:
         op.drop_table("shipstation_skipped_orders")
-    if insp.has_table("shipstation_sync_runs"):
+    if "shipstation_sync_runs" in tables:
         op.drop_table("shipstation_sync_runs")
 
-    idx_names = {ix.get("name") for ix in insp.get_indexes("distribution_log_entries")}
-    if "uq_distribution_log_source_external_key" in idx_names:
+    if any(ix.get("name") == "uq_distribution_log_source_external_key" for ix in insp.get_indexes("distribution_log_entries")):
         op.drop_index("uq_distribution_log_source_external_key", table_name="distribution_log_entries")
 
-    cols = {c["name"] for c in insp.get_columns("distribution_log_entries")}
-    if "external_key" in cols:
+    if any(c["name"] == "external_key" for c in insp.get_columns("distribution_log_entries")):
         with op.batch_alter_table("distribution_log_entries") as batch_op:
             batch_op.drop_column("external_key")
 
@@ -15,6 +15,8 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy import inspect
 
+from migrations._helpers import ensure_external_key
+
 
 # revision identifiers, used by Alembic.
 revision: str = "8b1c2d3e4f50"
@@ -26,27 +28,16 @@ depends_on: Union[str, Sequence[str], None] = None
 def upgrade() -> None:
     bind = op.get_bind()
     insp = inspect(bind)
+    # One catalog query for table existence, reused by every check below
+    tables = set(insp.get_table_names())
 
     # distribution_log_entries.external_key + unique index (source, external_key)
-    if insp.has_table("distribution_log_entries"):
-        cols = {c["name"] for c in insp.get_columns("distribution_log_entries")}
-        if "external_key" not in cols:
-            with op.batch_alter_table("distribution_log_entries") as batch_op:
-                batch_op.add_column(sa.Column("external_key", sa.Text(), nullable=True))
-
-        idx_names = {ix.get("name") for ix in insp.get_indexes("distribution_log_entries")}
-        if "uq_distribution_log_source_external_key" not in idx_names:
-            op.create_index(
-                "uq_distribution_log_source_external_key",
-                "distribution_log_entries",
-                ["source", "external_key"],
-                unique=True,
-            )
+    if "distribution_log_entries" in tables:
+        ensure_external_key(insp)
 
     # tracing_reports.generated_by_user_id (nullable) + FK to users if missing
-    if insp.has_table("tracing_reports"):
-        cols = {c["name"] for c in insp.get_columns("tracing_reports")}
-        if "generated_by_user_id" not in cols:
+    if "tracing_reports" in tables:
+        if not any(c["name"] == "generated_by_user_id" for c in insp.get_columns("tracing_reports")):
             with op.batch_alter_table("tracing_reports") as batch_op:
                 batch_op.add_column(sa.Column("generated_by_user_id", sa.Integer(), nullable=True))
 
@@ -55,8 +46,7 @@ def upgrade() -> None:
             fks = insp.get_foreign_keys("tracing_reports")
         except Exception:
             fks = []
-        fk_names = {fk.get("name") for fk in fks if fk.get("name")}
-        if "fk_tracing_reports_generated_by_user_id" not in fk_names:
+        if not any(fk.get("name") == "fk_tracing_reports_generated_by_user_id" for fk in fks):
             with op.batch_alter_table("tracing_reports") as batch_op:
                 batch_op.create_foreign_key(
                     "fk_tracing_reports_generated_by_user_id",
@@ -70,29 +60,27 @@ def upgrade() -> None:
 def downgrade() -> None:
     bind = op.get_bind()
     insp = inspect(bind)
+    # One catalog query for table existence, reused by every check below
+    tables = set(insp.get_table_names())
 
-    if insp.has_table("tracing_reports"):
+    if "tracing_reports" in tables:
         try:
             fks = insp.get_foreign_keys("tracing_reports")
         except Exception:
             fks = []
-        fk_names = {fk.get("name") for fk in fks if fk.get("name")}
-        if "fk_tracing_reports_generated_by_user_id" in fk_names:
+        if any(fk.get("name") == "fk_tracing_reports_generated_by_user_id" for fk in fks):
             with op.batch_alter_table("tracing_reports") as batch_op:
                 batch_op.drop_constraint("fk_tracing_reports_generated_by_user_id", type_="foreignkey")
 
-        cols = {c["name"] for c in insp.get_columns("tracing_reports")}
-        if "generated_by_user_id" in cols:
+        if any(c["name"] == "generated_by_user_id" for c in insp.get_columns("tracing_reports")):
             with op.batch_alter_table("tracing_reports") as batch_op:
                 batch_op.drop_column("generated_by_user_id")
 
-    if insp.has_table("distribution_log_entries"):
-        idx_names = {ix.get("name") for ix in insp.get_indexes("distribution_log_entries")}
-        if "uq_distribution_log_source_external_key" in idx_names:
+    if "distribution_log_entries" in tables:
+        if any(ix.get("name") == "uq_distribution_log_source_external_key" for ix in insp.get_indexes("distribution_log_entries")):
             op.drop_index("uq_distribution_log_source_external_key", table_name="distribution_log_entries")
 
-        cols = {c["name"] for c in insp.get_columns("distribution_log_entries")}
-        if "external_key" in cols:
+        if any(c["name"] == "external_key" for c in insp.get_columns("distribution_log_entries")):
             with op.batch_alter_table("distribution_log_entries") as batch_op:
                 batch_op.drop_column("external_key")
 
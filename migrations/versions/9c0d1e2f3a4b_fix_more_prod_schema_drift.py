@@ -13,7 +13,9 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+from migrations._helpers import existing_columns
 
 
 revision: str = "9c0d1e2f3a4b"
@@ -22,44 +24,55 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
-def _add_column_if_missing(table: str, col: sa.Column) -> None:
-    bind = op.get_bind()
-    insp = inspect(bind)
-    if not insp.has_table(table):
+def _add_columns_if_missing(bind: Connection, table: str, columns: list[sa.Column]) -> None:
+    """Add whichever of `columns` the table lacks; skip tables that don't exist."""
+    existing = existing_columns(bind, table)
+    if existing is None:
         return
-    cols = {c["name"] for c in insp.get_columns(table)}
-    if col.name not in cols:
-        with op.batch_alter_table(table) as batch_op:
-            batch_op.add_column(col)
+    # Additive, constraint-free DDL (every column here is nullable, no FKs): plain ADD COLUMN
+    # works everywhere, no batch wrapper needed.
+    for col in columns:
+        if col.name not in existing:
+            op.add_column(table, col)
 
 
 def upgrade() -> None:
+    bind = op.get_bind()
+
     # tracing_reports.filters_json (nullable TEXT)
-    _add_column_if_missing("tracing_reports", sa.Column("filters_json", sa.Text(), nullable=True))
+    _add_columns_if_missing(bind, "tracing_reports", [sa.Column("filters_json", sa.Text(), nullable=True)])
 
     # shipstation_sync_runs run metrics (all nullable for safety)
-    _add_column_if_missing("shipstation_sync_runs", sa.Column("synced_count", sa.Integer(), nullable=True))
-    _add_column_if_missing("shipstation_sync_runs", sa.Column("skipped_count", sa.Integer(), nullable=True))
-    _add_column_if_missing("shipstation_sync_runs", sa.Column("orders_seen", sa.Integer(), nullable=True))
-    _add_column_if_missing("shipstation_sync_runs", sa.Column("shipments_seen", sa.Integer(), nullable=True))
-    _add_column_if_missing("shipstation_sync_runs", sa.Column("duration_seconds", sa.Integer(), nullable=True))
-    _add_column_if_missing("shipstation_sync_runs", sa.Column("message", sa.Text(), nullable=True))
+    _add_columns_if_missing(
+        bind,
+        "shipstation_sync_runs",
+        [
+            sa.Column("synced_count", sa.Integer(), nullable=True),
+            sa.Column("skipped_count", sa.Integer(), nullable=True),
+            sa.Column("orders_seen", sa.Integer(), nullable=True),
+            sa.Column("shipments_seen", sa.Integer(), nullable=True),
+            sa.Column("duration_seconds", sa.Integer(), nullable=True),
+            sa.Column("message", sa.Text(), nullable=True),
+        ],
+    )
 
 
 def downgrade() -> None:
     bind = op.get_bind()
-    insp = inspect(bind)
 
-    if insp.has_table("shipstation_sync_runs"):
-        cols = {c["name"] for c in insp.get_columns("shipstation_sync_runs")}
-        for name in ("message", "duration_seconds", "shipments_seen", "orders_seen", "skipped_count", "synced_count"):
-            if name in cols:
-                with op.batch_alter_table("shipstation_sync_runs") as batch_op:
+    cols = existing_columns(bind, "shipstation_sync_runs")
+    if cols is not None:
+        to_drop = [
+            name
+            for name in ("message", "duration_seconds", "shipments_seen", "orders_seen", "skipped_count", "synced_count")
+            if name in cols
+        ]
+        if to_drop:
+            with op.batch_alter_table("shipstation_sync_runs") as batch_op:
+                for name in to_drop:
                     batch_op.drop_column(name)
 
-    if insp.has_table("tracing_reports"):
-        cols = {c["name"] for c in insp.get_columns("tracing_reports")}
-        if "filters_json" in cols:
-            with op.batch_alter_table("tracing_reports") as batch_op:
-                batch_op.drop_column("filters_json")
-
+    cols = existing_columns(bind, "tracing_reports")
+    if cols is not None and "filters_json" in cols:
+        with op.batch_alter_table("tracing_reports") as batch_op:
+            batch_op.drop_column("filters_json")
@@ -12,6 +12,8 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy import inspect
 
+from migrations._helpers import table_exists
+
 
 # revision identifiers, used by Alembic.
 revision: str = "9f2c1a3d4b5c"
@@ -23,15 +25,18 @@ depends_on: Union[str, Sequence[str], None] = None
 def upgrade() -> None:
     bind = op.get_bind()
     insp = inspect(bind)
-    existing_tables = set(insp.get_table_names())
 
-    def _has_index(table: str, name: str) -> bool:
+    def _index_names(table: str) -> set[str]:
         try:
-            return any(ix.get("name") == name for ix in insp.get_indexes(table))
+            return {ix.get("name") for ix in insp.get_indexes(table)}
         except Exception:
-            return False
+            return set()
 
-    if "customers" not in existing_tables:
+    # A table created here has no indexes yet, so only reflect ones that already existed.
+    customers_indexes: set[str] = set()
+    if table_exists(bind, "customers"):
+        customers_indexes = _index_names("customers")
+    else:
         op.create_table(
             "customers",
             sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
@@ -50,58 +55,55 @@ def upgrade() -> None:
                 "created_at",
                 sa.DateTime(timezone=False),
                 nullable=False,
-                server_default=sa.func.current_timestamp(),
+                server_default=sa.text("CURRENT_TIMESTAMP"),
             ),
             sa.Column(
                 "updated_at",
                 sa.DateTime(timezone=False),
                 nullable=False,
-                server_default=sa.func.current_timestamp(),
+                server_default=sa.text("CURRENT_TIMESTAMP"),
             ),
             sa.ForeignKeyConstraint(["primary_rep_id"], ["users.id"], ondelete="SET NULL"),
             sa.UniqueConstraint("company_key", name="uq_customers_company_key"),
         )
-        existing_tables.add("customers")
-
-    if "customers" in existing_tables:
-        insp = inspect(op.get_bind())
-        for idx_name, cols in (
-            ("idx_customers_company_key", ["company_key"]),
-            ("idx_customers_facility_name", ["facility_name"]),
-            ("idx_customers_state", ["state"]),
-            ("idx_customers_primary_rep_id", ["primary_rep_id"]),
-        ):
-            if not _has_index("customers", idx_name):
-                op.create_index(idx_name, "customers", cols)
-
-    if "customer_notes" not in existing_tables:
+
+    for idx_name, cols in (
+        ("idx_customers_company_key", ["company_key"]),
+        ("idx_customers_facility_name", ["facility_name"]),
+        ("idx_customers_state", ["state"]),
+        ("idx_customers_primary_rep_id", ["primary_rep_id"]),
+    ):
+        if idx_name not in customers_indexes:
+            op.create_index(idx_name, "customers", cols)
+
+    notes_indexes: set[str] = set()
+    if table_exists(bind, "customer_notes"):
+        notes_indexes = _index_names("customer_notes")
+    else:
         op.create_table(
             "customer_notes",
             sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
             sa.Column("customer_id", sa.Integer(), nullable=False),
             sa.Column("note_text", sa.Text(), nullable=False),
-            sa.Column("note_date", sa.Date(), nullable=True, server_default=sa.func.current_date()),
+            sa.Column("note_date", sa.Date(), nullable=True, server_default=sa.text("CURRENT_DATE")),
             sa.Column("author", sa.Text(), nullable=True),
             sa.Column(
                 "created_at",
                 sa.DateTime(timezone=False),
                 nullable=False,
-                server_default=sa.func.current_timestamp(),
+                server_default=sa.text("CURRENT_TIMESTAMP"),
             ),
             sa.Column(
                 "updated_at",
                 sa.DateTime(timezone=False),
                 nullable=False,
-                server_default=sa.func.current_timestamp(),
+                server_default=sa.text("CURRENT_TIMESTAMP"),
             ),
             sa.ForeignKeyConstraint(["customer_id"], ["customers.id"], ondelete="CASCADE"),
         )
-        existing_tables.add("customer_notes")
 
-    if "customer_notes" in existing_tables:
-        insp = inspect(op.get_bind())
-        if not _has_index("customer_notes", "idx_customer_notes_customer_id"):
-            op.create_index("idx_customer_notes_customer_id", "customer_notes", ["customer_id", "created_at"])
+    if "idx_customer_notes_customer_id" not in notes_indexes:
+        op.create_index("idx_customer_notes_customer_id", "customer_notes", ["customer_id", "created_at"])
 
 
 def downgrade() -> None:
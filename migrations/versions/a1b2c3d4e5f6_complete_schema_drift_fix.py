@@ -15,7 +15,10 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateColumn
+
+from migrations._helpers import existing_columns
 
 
 revision: str = "a1b2c3d4e5f6"
@@ -24,84 +27,56 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
-def _add_column_if_missing(table: str, col: sa.Column) -> None:
-    """Add a column only if the table exists and the column is missing."""
-    bind = op.get_bind()
-    insp = inspect(bind)
-    if not insp.has_table(table):
+# Every column is nullable: existing rows predate them and the migration must not fail on them.
+DRIFT_COLUMNS: dict[str, list[tuple[str, sa.types.TypeEngine, str | None]]] = {
+    "tracing_reports": [
+        ("report_storage_key", sa.Text(), None),
+        ("report_format", sa.String(16), "csv"),
+        ("status", sa.String(16), "draft"),
+        ("sha256", sa.String(64), None),
+        ("row_count", sa.Integer(), "0"),
+        ("created_at", sa.DateTime(timezone=False), None),
+        ("updated_at", sa.DateTime(timezone=False), None),
+        ("generated_at", sa.DateTime(timezone=False), None),
+        ("generated_by_user_id", sa.Integer(), None),
+    ],
+    "shipstation_skipped_orders": [
+        ("details_json", sa.Text(), None),
+        ("order_id", sa.Text(), None),
+        ("order_number", sa.Text(), None),
+        ("reason", sa.Text(), None),
+        ("created_at", sa.DateTime(timezone=False), None),
+    ],
+    "shipstation_sync_runs": [
+        ("ran_at", sa.DateTime(timezone=False), None),
+    ],
+}
+
+
+def _add_columns_if_missing(bind: Connection, table: str, specs: list[tuple[str, sa.types.TypeEngine, str | None]]) -> None:
+    """Add whichever of the spec'd columns the table lacks; skip tables that don't exist."""
+    # Columns are built per call: add_column attaches them to a table, so they can't be shared.
+    columns = [sa.Column(name, type_, nullable=True, server_default=default) for name, type_, default in specs]
+    if bind.dialect.name == "postgresql":
+        # Postgres does both existence checks itself: one ALTER per table, no catalog probes.
+        op.execute(
+            f"ALTER TABLE IF EXISTS {table} "
+            + ", ".join(f"ADD COLUMN IF NOT EXISTS {CreateColumn(col).compile(dialect=bind.dialect)}" for col in columns)
+        )
+        return
+    existing = existing_columns(bind, table)
+    if existing is None:
         return
-    cols = {c["name"] for c in insp.get_columns(table)}
-    if col.name not in cols:
-        with op.batch_alter_table(table) as batch_op:
-            batch_op.add_column(col)
+    # Additive, constraint-free DDL: plain ADD COLUMN works everywhere, no batch wrapper needed.
+    for col in columns:
+        if col.name not in existing:
+            op.add_column(table, col)
 
 
 def upgrade() -> None:
-    # --- tracing_reports: add all potentially missing columns ---
-    _add_column_if_missing(
-        "tracing_reports",
-        sa.Column("report_storage_key", sa.Text(), nullable=True),  # nullable for existing rows
-    )
-    _add_column_if_missing(
-        "tracing_reports",
-        sa.Column("report_format", sa.String(16), nullable=True, server_default="csv"),
-    )
-    _add_column_if_missing(
-        "tracing_reports",
-        sa.Column("status", sa.String(16), nullable=True, server_default="draft"),
-    )
-    _add_column_if_missing(
-        "tracing_reports",
-        sa.Column("sha256", sa.String(64), nullable=True),
-    )
-    _add_column_if_missing(
-        "tracing_reports",
-        sa.Column("row_count", sa.Integer(), nullable=True, server_default="0"),
-    )
-    _add_column_if_missing(
-        "tracing_reports",
-        sa.Column("created_at", sa.DateTime(timezone=False), nullable=True),
-    )
-    _add_column_if_missing(
-        "tracing_reports",
-        sa.Column("updated_at", sa.DateTime(timezone=False), nullable=True),
-    )
-    _add_column_if_missing(
-        "tracing_reports",
-        sa.Column("generated_at", sa.DateTime(timezone=False), nullable=True),
-    )
-    _add_column_if_missing(
-        "tracing_reports",
-        sa.Column("generated_by_user_id", sa.Integer(), nullable=True),
-    )
-
-    # --- shipstation_skipped_orders: add all potentially missing columns ---
-    _add_column_if_missing(
-        "shipstation_skipped_orders",
-        sa.Column("details_json", sa.Text(), nullable=True),
-    )
-    _add_column_if_missing(
-        "shipstation_skipped_orders",
-        sa.Column("order_id", sa.Text(), nullable=True),
-    )
-    _add_column_if_missing(
-        "shipstation_skipped_orders",
-        sa.Column("order_number", sa.Text(), nullable=True),
-    )
-    _add_column_if_missing(
-        "shipstation_skipped_orders",
-        sa.Column("reason", sa.Text(), nullable=True),  # nullable for migration safety
-    )
-    _add_column_if_missing(
-        "shipstation_skipped_orders",
-        sa.Column("created_at", sa.DateTime(timezone=False), nullable=True),
-    )
-
-    # --- shipstation_sync_runs: ensure ran_at exists ---
-    _add_column_if_missing(
-        "shipstation_sync_runs",
-        sa.Column("ran_at", sa.DateTime(timezone=False), nullable=True),
-    )
+    bind = op.get_bind()
+    for table, specs in DRIFT_COLUMNS.items():
+        _add_columns_if_missing(bind, table, specs)
 
 
 def downgrade() -> None:
@@ -10,37 +10,86 @@ from typing import Sequence, Union
 from alembic import op
 import sqlalchemy as sa
 
+from migrations._helpers import create_index_concurrently, table_exists
+
 
 revision: str = "aa3f4c5d6e7f"
 down_revision: Union[str, Sequence[str], None] = "199268f34bba"
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+BACKFILL_CHUNK_SIZE = 50_000
+
+ENTRY_FK_NAME = "distribution_lines_distribution_entry_id_fkey"
+
+_BACKFILL_SQL = sa.text(
+    """
+    INSERT INTO distribution_lines (distribution_entry_id, sku, lot_number, quantity, created_at)
+    SELECT id, sku, lot_number, quantity, created_at
+    FROM distribution_log_entries
+    WHERE id BETWEEN :lo AND :hi
+      AND sku IS NOT NULL AND lot_number IS NOT NULL AND quantity IS NOT NULL
+    """
+)
+
+
+def _has_entry_fk(conn) -> bool:
+    return bool(conn.execute(
+        sa.text(
+            "SELECT 1 FROM pg_constraint "
+            "WHERE conrelid = CAST('distribution_lines' AS regclass) AND conname = :name"
+        ),
+        {"name": ENTRY_FK_NAME},
+    ).first())
+
 
 def upgrade() -> None:
-    op.create_table(
-        "distribution_lines",
-        sa.Column("id", sa.Integer(), primary_key=True),
-        sa.Column("distribution_entry_id", sa.Integer(), sa.ForeignKey("distribution_log_entries.id", ondelete="CASCADE"), nullable=False),
-        sa.Column("sku", sa.Text(), nullable=False),
-        sa.Column("lot_number", sa.Text(), nullable=False),
-        sa.Column("quantity", sa.Integer(), nullable=False),
-        sa.Column("created_at", sa.DateTime(timezone=False), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
-        sa.CheckConstraint("sku IN ('211810SPT','211610SPT','211410SPT')", name="ck_distribution_lines_sku"),
-        sa.CheckConstraint("quantity > 0", name="ck_distribution_lines_quantity"),
-    )
-    op.create_index("idx_distribution_lines_entry_id", "distribution_lines", ["distribution_entry_id"])
-    op.create_index("idx_distribution_lines_sku", "distribution_lines", ["sku"])
-
-    # Backfill existing distribution_log_entries into distribution_lines
-    op.execute(
-        """
-        INSERT INTO distribution_lines (distribution_entry_id, sku, lot_number, quantity, created_at)
-        SELECT id, sku, lot_number, quantity, created_at
-        FROM distribution_log_entries
-        WHERE sku IS NOT NULL AND lot_number IS NOT NULL AND quantity IS NOT NULL
-        """
-    )
+    # Everything after create_table commits as it goes, so each step is guarded and a run that
+    # was interrupted part-way through can simply be re-run.
+    bind = op.get_bind()
+    # On Postgres the entry FK is added after the backfill (see below); elsewhere it stays inline.
+    defer_entry_fk = bind.dialect.name == "postgresql"
+    entry_fk = () if defer_entry_fk else (sa.ForeignKey("distribution_log_entries.id", ondelete="CASCADE"),)
+    if not table_exists(bind, "distribution_lines"):
+        op.create_table(
+            "distribution_lines",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("distribution_entry_id", sa.Integer(), *entry_fk, nullable=False),
+            sa.Column("sku", sa.Text(), nullable=False),
+            sa.Column("lot_number", sa.Text(), nullable=False),
+            sa.Column("quantity", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=False), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
+            sa.CheckConstraint("sku IN ('211810SPT','211610SPT','211410SPT')", name="ck_distribution_lines_sku"),
+            sa.CheckConstraint("quantity > 0", name="ck_distribution_lines_quantity"),
+        )
+
+    # Backfill existing distribution_log_entries into distribution_lines. Chunked by id and
+    # committed per chunk so a large table doesn't hold one long write lock / WAL segment.
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        max_id = conn.execute(sa.text("SELECT COALESCE(MAX(id), 0) FROM distribution_log_entries")).scalar()
+        # Chunks run in id order and each commits as one statement, so everything up to the
+        # highest copied entry id is done: an interrupted run resumes just past it.
+        start = conn.execute(sa.text("SELECT COALESCE(MAX(distribution_entry_id), 0) + 1 FROM distribution_lines")).scalar()
+        for lo in range(start, max_id + 1, BACKFILL_CHUNK_SIZE):
+            conn.execute(_BACKFILL_SQL, {"lo": lo, "hi": lo + BACKFILL_CHUNK_SIZE - 1})
+
+        if defer_entry_fk:
+            # NOT VALID skips per-row checks; VALIDATE then checks the loaded rows in one scan
+            # (and is a no-op if a previous run already validated it).
+            # Named as Postgres names the inline FK, so fresh and existing databases match.
+            if not _has_entry_fk(conn):
+                op.execute(
+                    f"ALTER TABLE distribution_lines ADD CONSTRAINT {ENTRY_FK_NAME} "
+                    "FOREIGN KEY (distribution_entry_id) REFERENCES distribution_log_entries (id) "
+                    "ON DELETE CASCADE NOT VALID"
+                )
+            op.execute(f"ALTER TABLE distribution_lines VALIDATE CONSTRAINT {ENTRY_FK_NAME}")
+
+        # Build indexes on the populated table in one pass rather than maintaining them per
+        # inserted row; CONCURRENTLY (Postgres only) keeps DML unblocked during the build.
+        create_index_concurrently(conn, "idx_distribution_lines_entry_id", "distribution_lines", ["distribution_entry_id"])
+        create_index_concurrently(conn, "idx_distribution_lines_sku", "distribution_lines", ["sku"])
 
 
 def downgrade() -> None:
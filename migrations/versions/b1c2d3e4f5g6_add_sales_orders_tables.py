@@ -8,6 +8,8 @@ Create Date: 2026-01-22 12:00:00.000000
 from alembic import op
 import sqlalchemy as sa
 
+from migrations._helpers import create_indexes
+
 
 # revision identifiers, used by Alembic.
 revision = 'b1c2d3e4f5g6'
@@ -16,6 +18,22 @@ branch_labels = None
 depends_on = None
 
 
+SALES_ORDERS_INDEXES = [
+    ('idx_sales_orders_customer_id', ['customer_id'], False),
+    ('idx_sales_orders_order_number', ['order_number'], False),
+    ('idx_sales_orders_order_date', ['order_date'], False),
+    ('idx_sales_orders_ship_date', ['ship_date'], False),
+    ('idx_sales_orders_source', ['source'], False),
+    ('idx_sales_orders_status', ['status'], False),
+    ('uq_sales_orders_source_external_key', ['source', 'external_key'], True),
+]
+
+SALES_ORDER_LINES_INDEXES = [
+    ('idx_sales_order_lines_sales_order_id', ['sales_order_id'], False),
+    ('idx_sales_order_lines_sku', ['sku'], False),
+]
+
+
 def upgrade():
     bind = op.get_bind()
     insp = sa.inspect(bind)
@@ -73,13 +91,7 @@ def upgrade():
     
     # Indexes for sales_orders
     if not has_sales_orders:
-        op.create_index('idx_sales_orders_customer_id', 'sales_orders', ['customer_id'])
-        op.create_index('idx_sales_orders_order_number', 'sales_orders', ['order_number'])
-        op.create_index('idx_sales_orders_order_date', 'sales_orders', ['order_date'])
-        op.create_index('idx_sales_orders_ship_date', 'sales_orders', ['ship_date'])
-        op.create_index('idx_sales_orders_source', 'sales_orders', ['source'])
-        op.create_index('idx_sales_orders_status', 'sales_orders', ['status'])
-        op.create_index('uq_sales_orders_source_external_key', 'sales_orders', ['source', 'external_key'], unique=True)
+        create_indexes(bind, 'sales_orders', SALES_ORDERS_INDEXES)
     
     # Create sales_order_lines table
     if not has_sales_order_lines:
@@ -117,8 +129,7 @@ def upgrade():
     
     # Indexes for sales_order_lines
     if not has_sales_order_lines:
-        op.create_index('idx_sales_order_lines_sales_order_id', 'sales_order_lines', ['sales_order_id'])
-        op.create_index('idx_sales_order_lines_sku', 'sales_order_lines', ['sku'])
+        create_indexes(bind, 'sales_order_lines', SALES_ORDER_LINES_INDEXES)
     
     # Add sales_order_id FK to distribution_log_entries
     bind = op.get_bind()
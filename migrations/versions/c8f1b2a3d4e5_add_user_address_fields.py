@@ -9,6 +9,7 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.schema import CreateColumn
 
 
 # revision identifiers, used by Alembic.
@@ -18,17 +19,36 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+ADDRESS_COLUMN_NAMES = ('address1', 'address2', 'city', 'state', 'zip')
+
+
+def _address_columns() -> list[sa.Column]:
+    return [
+        sa.Column('address1', sa.String(length=255), nullable=True),
+        sa.Column('address2', sa.String(length=255), nullable=True),
+        sa.Column('city', sa.String(length=128), nullable=True),
+        sa.Column('state', sa.String(length=32), nullable=True),
+        sa.Column('zip', sa.String(length=20), nullable=True),
+    ]
+
+
 def upgrade() -> None:
-    op.add_column('users', sa.Column('address1', sa.String(length=255), nullable=True))
-    op.add_column('users', sa.Column('address2', sa.String(length=255), nullable=True))
-    op.add_column('users', sa.Column('city', sa.String(length=128), nullable=True))
-    op.add_column('users', sa.Column('state', sa.String(length=32), nullable=True))
-    op.add_column('users', sa.Column('zip', sa.String(length=20), nullable=True))
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for col in _address_columns():
+            op.add_column('users', col)
+        return
+    # One ALTER (and one table lock) for all five columns.
+    op.execute(
+        'ALTER TABLE users '
+        + ', '.join(f'ADD COLUMN {CreateColumn(col).compile(dialect=bind.dialect)}' for col in _address_columns())
+    )
 
 
 def downgrade() -> None:
-    op.drop_column('users', 'zip')
-    op.drop_column('users', 'state')
-    op.drop_column('users', 'city')
-    op.drop_column('users', 'address2')
-    op.drop_column('users', 'address1')
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for name in reversed(ADDRESS_COLUMN_NAMES):
+            op.drop_column('users', name)
+        return
+    op.execute('ALTER TABLE users ' + ', '.join(f'DROP COLUMN {name}' for name in reversed(ADDRESS_COLUMN_NAMES)))
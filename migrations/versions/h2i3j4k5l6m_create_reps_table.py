@@ -9,6 +9,8 @@ from typing import Sequence, Union
 from alembic import op
 import sqlalchemy as sa
 
+from migrations._helpers import has_index
+
 
 # revision identifiers, used by Alembic.
 revision: str = "h2i3j4k5l6m"
@@ -16,6 +18,13 @@ down_revision: Union[str, Sequence[str], None] = "g1h2i3j4k5l6"
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+# (table, constraint, column, ON DELETE action) for the rep FKs repointed from users to reps.
+REP_FOREIGN_KEYS = (
+    ("customers", "customers_primary_rep_id_fkey", "primary_rep_id", "SET NULL"),
+    ("customer_reps", "customer_reps_rep_id_fkey", "rep_id", "CASCADE"),
+    ("distribution_log_entries", "distribution_log_entries_rep_id_fkey", "rep_id", "SET NULL"),
+)
+
 
 def upgrade() -> None:
     bind = op.get_bind()
@@ -46,80 +55,49 @@ def upgrade() -> None:
         if "updated_at" not in existing_columns:
             op.add_column("reps", sa.Column("updated_at", sa.DateTime(timezone=False), nullable=False, server_default=sa.text("NOW()")))
 
-    # Ensure index exists
-    existing_indexes = {idx["name"] for idx in insp.get_indexes("reps")} if insp.has_table("reps") else set()
-    if "idx_reps_name" not in existing_indexes:
-        op.create_index("idx_reps_name", "reps", ["name"])
-
-    # Seed reps from users referenced by rep assignments.
+    # Seed reps from users referenced by rep assignments. The IN semi-join already
+    # de-duplicates (and u.id is the users PK), so the branches are plain UNION ALL.
     op.execute(
         """
         INSERT INTO reps (id, name, email, is_active, created_at, updated_at)
-        SELECT DISTINCT u.id, u.email, u.email, u.is_active, NOW(), NOW()
+        SELECT u.id, u.email, u.email, u.is_active, NOW(), NOW()
         FROM users u
         WHERE u.id IN (
-            SELECT DISTINCT primary_rep_id FROM customers WHERE primary_rep_id IS NOT NULL
-            UNION
-            SELECT DISTINCT rep_id FROM customer_reps WHERE rep_id IS NOT NULL
-            UNION
-            SELECT DISTINCT rep_id FROM distribution_log_entries WHERE rep_id IS NOT NULL
+            SELECT primary_rep_id FROM customers WHERE primary_rep_id IS NOT NULL
+            UNION ALL
+            SELECT rep_id FROM customer_reps WHERE rep_id IS NOT NULL
+            UNION ALL
+            SELECT rep_id FROM distribution_log_entries WHERE rep_id IS NOT NULL
         )
         ON CONFLICT (id) DO NOTHING
         """
     )
 
-    # Repoint foreign keys to reps (Postgres-safe).
-    op.execute("ALTER TABLE customers DROP CONSTRAINT IF EXISTS customers_primary_rep_id_fkey")
-    op.execute(
-        """
-        DO $$
-        BEGIN
-          ALTER TABLE customers
-          ADD CONSTRAINT customers_primary_rep_id_fkey
-          FOREIGN KEY (primary_rep_id) REFERENCES reps (id) ON DELETE SET NULL;
-        EXCEPTION WHEN duplicate_object THEN
-          NULL;
-        END $$;
-        """
-    )
-
-    op.execute("ALTER TABLE customer_reps DROP CONSTRAINT IF EXISTS customer_reps_rep_id_fkey")
-    op.execute(
-        """
-        DO $$
-        BEGIN
-          ALTER TABLE customer_reps
-          ADD CONSTRAINT customer_reps_rep_id_fkey
-          FOREIGN KEY (rep_id) REFERENCES reps (id) ON DELETE CASCADE;
-        EXCEPTION WHEN duplicate_object THEN
-          NULL;
-        END $$;
-        """
-    )
+    # Ensure index exists; built after the seed so it's one bulk build, not per-row maintenance.
+    if not has_index(insp, "reps", "idx_reps_name"):
+        op.create_index("idx_reps_name", "reps", ["name"])
 
-    op.execute("ALTER TABLE distribution_log_entries DROP CONSTRAINT IF EXISTS distribution_log_entries_rep_id_fkey")
-    op.execute(
-        """
-        DO $$
-        BEGIN
-          ALTER TABLE distribution_log_entries
-          ADD CONSTRAINT distribution_log_entries_rep_id_fkey
-          FOREIGN KEY (rep_id) REFERENCES reps (id) ON DELETE SET NULL;
-        EXCEPTION WHEN duplicate_object THEN
-          NULL;
-        END $$;
-        """
-    )
+    # Repoint foreign keys to reps (Postgres-safe). Dropping and re-adding in one ALTER takes
+    # one lock per table, and the ADD can't collide once the DROP IF EXISTS has run.
+    # NOT VALID skips the row scan under that lock; VALIDATE then scans under SHARE UPDATE
+    # EXCLUSIVE, which doesn't block writes. Autocommit so the ALTER's lock isn't held
+    # through the validation scans.
+    with op.get_context().autocommit_block():
+        for table, constraint, column, on_delete in REP_FOREIGN_KEYS:
+            op.execute(
+                f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}, "
+                f"ADD CONSTRAINT {constraint} FOREIGN KEY ({column}) REFERENCES reps (id) ON DELETE {on_delete} "
+                "NOT VALID"
+            )
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}")
 
 
 def downgrade() -> None:
-    op.execute("ALTER TABLE distribution_log_entries DROP CONSTRAINT IF EXISTS distribution_log_entries_rep_id_fkey")
-    op.execute("ALTER TABLE customer_reps DROP CONSTRAINT IF EXISTS customer_reps_rep_id_fkey")
-    op.execute("ALTER TABLE customers DROP CONSTRAINT IF EXISTS customers_primary_rep_id_fkey")
-
-    op.execute("ALTER TABLE distribution_log_entries ADD CONSTRAINT distribution_log_entries_rep_id_fkey FOREIGN KEY (rep_id) REFERENCES users (id) ON DELETE SET NULL")
-    op.execute("ALTER TABLE customer_reps ADD CONSTRAINT customer_reps_rep_id_fkey FOREIGN KEY (rep_id) REFERENCES users (id) ON DELETE CASCADE")
-    op.execute("ALTER TABLE customers ADD CONSTRAINT customers_primary_rep_id_fkey FOREIGN KEY (primary_rep_id) REFERENCES users (id) ON DELETE SET NULL")
+    for table, constraint, column, on_delete in reversed(REP_FOREIGN_KEYS):
+        op.execute(
+            f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}, "
+            f"ADD CONSTRAINT {constraint} FOREIGN KEY ({column}) REFERENCES users (id) ON DELETE {on_delete}"
+        )
 
     op.drop_index("idx_reps_name", table_name="reps")
     op.drop_table("reps")
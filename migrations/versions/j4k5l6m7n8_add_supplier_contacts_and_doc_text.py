@@ -8,6 +8,7 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.schema import CreateColumn
 
 
 revision: str = "j4k5l6m7n8"
@@ -16,10 +17,28 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+CONTACT_COLUMN_NAMES = ("contact_name", "contact_email", "contact_phone")
+
+
+def _contact_columns() -> list[sa.Column]:
+    return [
+        sa.Column("contact_name", sa.String(255), nullable=True),
+        sa.Column("contact_email", sa.String(255), nullable=True),
+        sa.Column("contact_phone", sa.String(64), nullable=True),
+    ]
+
+
 def upgrade() -> None:
-    op.add_column("suppliers", sa.Column("contact_name", sa.String(255), nullable=True))
-    op.add_column("suppliers", sa.Column("contact_email", sa.String(255), nullable=True))
-    op.add_column("suppliers", sa.Column("contact_phone", sa.String(64), nullable=True))
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        for col in _contact_columns():
+            op.add_column("suppliers", col)
+    else:
+        # One ALTER (and one table lock) for all three columns.
+        op.execute(
+            "ALTER TABLE suppliers "
+            + ", ".join(f"ADD COLUMN {CreateColumn(col).compile(dialect=bind.dialect)}" for col in _contact_columns())
+        )
 
     op.add_column("managed_documents", sa.Column("extracted_text", sa.Text(), nullable=True))
 
@@ -27,6 +46,9 @@ def upgrade() -> None:
 def downgrade() -> None:
     op.drop_column("managed_documents", "extracted_text")
 
-    op.drop_column("suppliers", "contact_phone")
-    op.drop_column("suppliers", "contact_email")
-    op.drop_column("suppliers", "contact_name")
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        for name in reversed(CONTACT_COLUMN_NAMES):
+            op.drop_column("suppliers", name)
+        return
+    op.execute("ALTER TABLE suppliers " + ", ".join(f"DROP COLUMN {name}" for name in reversed(CONTACT_COLUMN_NAMES)))
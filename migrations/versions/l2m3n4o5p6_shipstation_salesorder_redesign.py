@@ -9,6 +9,8 @@ from typing import Sequence, Union
 from alembic import op
 import sqlalchemy as sa
 
+from migrations._helpers import create_index_concurrently, has_column
+
 
 # revision identifiers, used by Alembic.
 revision: str = "l2m3n4o5p6"
@@ -18,16 +20,24 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    op.add_column("customers", sa.Column("customer_code", sa.Text(), nullable=True))
-    op.create_index("idx_customers_customer_code", "customers", ["customer_code"])
-    op.drop_constraint("ck_sales_order_lines_sku", "sales_order_lines", type_="check")
+    # The autocommit block commits the column before the index build starts, so a failed build
+    # is re-run against a database that already has the column (and maybe an INVALID index).
+    if not has_column(sa.inspect(op.get_bind()), "customers", "customer_code"):
+        op.add_column("customers", sa.Column("customer_code", sa.Text(), nullable=True))
+    # customers is live: on Postgres build CONCURRENTLY so writers aren't blocked, which
+    # has to run outside the migration transaction.
+    with op.get_context().autocommit_block():
+        create_index_concurrently(op.get_bind(), "idx_customers_customer_code", "customers", ["customer_code"])
+    # SQLite can't drop a CHECK in place; batch mode rebuilds the table there, plain ALTER elsewhere.
+    with op.batch_alter_table("sales_order_lines") as batch_op:
+        batch_op.drop_constraint("ck_sales_order_lines_sku", type_="check")
 
 
 def downgrade() -> None:
-    op.create_check_constraint(
-        "ck_sales_order_lines_sku",
-        "sales_order_lines",
-        "sku IN ('211810SPT','211610SPT','211410SPT')",
-    )
+    with op.batch_alter_table("sales_order_lines") as batch_op:
+        batch_op.create_check_constraint(
+            "ck_sales_order_lines_sku",
+            "sku IN ('211810SPT','211610SPT','211410SPT')",
+        )
     op.drop_index("idx_customers_customer_code", table_name="customers")
     op.drop_column("customers", "customer_code")
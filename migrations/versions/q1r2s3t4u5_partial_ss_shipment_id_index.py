@@ -0,0 +1,64 @@
+"""Make uq_distribution_log_ss_shipment_id a partial index on Postgres.
+
+Only ShipStation rows carry a shipment id, so the full unique index holds one
+entry per NULL. The dedupe lookups filter ss_shipment_id = :id, which implies
+the predicate, so they keep using the partial index. Other dialects keep the
+full index (SQLite already allows any number of NULLs in a unique index).
+
+Revision ID: q1r2s3t4u5
+Revises: p1q2r3s4t5
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "q1r2s3t4u5"
+down_revision: Union[str, Sequence[str], None] = "p1q2r3s4t5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "uq_distribution_log_ss_shipment_id"
+TMP_INDEX_NAME = "uq_distribution_log_ss_shipment_id_new"
+
+
+def _is_partial(bind, name: str) -> bool | None:
+    """None if index `name` doesn't exist, else whether it has a WHERE predicate."""
+    return bind.execute(
+        sa.text("SELECT indpred IS NOT NULL FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": name},
+    ).scalar()
+
+
+def _rebuild(partial: bool) -> None:
+    """Swap the index for a partial/full one without blocking writes to distribution_log_entries."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    if _is_partial(bind, INDEX_NAME) is partial and _is_partial(bind, TMP_INDEX_NAME) is None:
+        return
+    with op.get_context().autocommit_block():
+        # Build the replacement first so uniqueness stays enforced throughout; a leftover from an
+        # interrupted run may be INVALID, so it is rebuilt rather than reused.
+        op.drop_index(TMP_INDEX_NAME, table_name="distribution_log_entries", postgresql_concurrently=True, if_exists=True)
+        op.create_index(
+            TMP_INDEX_NAME,
+            "distribution_log_entries",
+            ["ss_shipment_id"],
+            unique=True,
+            postgresql_concurrently=True,
+            postgresql_where=sa.text("ss_shipment_id IS NOT NULL") if partial else None,
+        )
+        op.drop_index(INDEX_NAME, table_name="distribution_log_entries", postgresql_concurrently=True, if_exists=True)
+        op.execute(f"ALTER INDEX {TMP_INDEX_NAME} RENAME TO {INDEX_NAME}")
+
+
+def upgrade() -> None:
+    _rebuild(partial=True)
+
+
+def downgrade() -> None:
+    _rebuild(partial=False)
@@ -0,0 +1,47 @@
+"""Drop the ix_* indexes k1l2m3n4o5 used to create.
+
+They duplicated idx_distribution_log_order_number, idx_distribution_log_customer_id
+and idx_sales_orders_order_number (same single columns), so every write paid for
+two identical indexes. k1l2m3n4o5 no longer creates them; this removes them from
+databases that ran the earlier version.
+
+Revision ID: r1s2t3u4v5
+Revises: q1r2s3t4u5
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations._helpers import has_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = "r1s2t3u4v5"
+down_revision: Union[str, Sequence[str], None] = "q1r2s3t4u5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, index)
+DUPLICATE_INDEXES = [
+    ("distribution_log_entries", "ix_distribution_log_entries_order_number"),
+    ("distribution_log_entries", "ix_distribution_log_entries_customer_id"),
+    ("sales_orders", "ix_sales_orders_order_number"),
+]
+
+
+def upgrade() -> None:
+    insp = sa.inspect(op.get_bind())
+    present = [(table, name) for table, name in DUPLICATE_INDEXES if has_index(insp, table, name)]
+    if not present:
+        return
+    # CONCURRENTLY (Postgres only) so the drops don't wait behind / block running writes.
+    with op.get_context().autocommit_block():
+        for table, name in present:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    # The idx_* indexes cover the same columns; nothing to restore.
+    pass
@@ -0,0 +1,35 @@
+"""Replace idx_distribution_log_source with (source, ship_date).
+
+The distribution log and the reports filter source = ... AND ship_date BETWEEN ...;
+the compound index serves that directly, and source-only filters use its prefix.
+
+Revision ID: s1t2u3v4w5
+Revises: r1s2t3u4v5
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from migrations._helpers import swap_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = "s1t2u3v4w5"
+down_revision: Union[str, Sequence[str], None] = "r1s2t3u4v5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    swap_index(
+        "distribution_log_entries",
+        create=[("idx_distribution_log_source_ship_date", ["source", "ship_date"])],
+        drop=["idx_distribution_log_source"],
+    )
+
+
+def downgrade() -> None:
+    swap_index(
+        "distribution_log_entries",
+        create=[("idx_distribution_log_source", ["source"])],
+        drop=["idx_distribution_log_source_ship_date"],
+    )
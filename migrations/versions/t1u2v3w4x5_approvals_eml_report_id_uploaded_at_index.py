@@ -0,0 +1,35 @@
+"""Replace the approvals_eml single-column indexes with (report_id, uploaded_at).
+
+The report page lists a report's approvals newest first (report_id = ... ORDER BY
+uploaded_at DESC); the compound index serves that without a sort, and report_id-only
+lookups (the tracing_reports ON DELETE CASCADE) use its prefix. Nothing filters on
+uploaded_at alone.
+
+Revision ID: t1u2v3w4x5
+Revises: s1t2u3v4w5
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from migrations._helpers import swap_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = "t1u2v3w4x5"
+down_revision: Union[str, Sequence[str], None] = "s1t2u3v4w5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COMPOUND_INDEX = ("idx_approvals_eml_report_id_uploaded_at", ["report_id", "uploaded_at"])
+SINGLE_INDEXES = [
+    ("idx_approvals_eml_report_id", ["report_id"]),
+    ("idx_approvals_eml_uploaded_at", ["uploaded_at"]),
+]
+
+
+def upgrade() -> None:
+    swap_index("approvals_eml", create=[COMPOUND_INDEX], drop=[name for name, _columns in SINGLE_INDEXES])
+
+
+def downgrade() -> None:
+    swap_index("approvals_eml", create=SINGLE_INDEXES, drop=[COMPOUND_INDEX[0]])
@@ -0,0 +1,47 @@
+"""Give the rep-traceability timestamp columns a CURRENT_TIMESTAMP server default.
+
+Rows written outside the ORM (bulk INSERT ... SELECT backfills, manual fixes) no
+longer have to supply created_at/updated_at/uploaded_at themselves.
+
+Revision ID: u1v2w3x4y5
+Revises: t1u2v3w4x5
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "u1v2w3x4y5"
+down_revision: Union[str, Sequence[str], None] = "t1u2v3w4x5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIMESTAMP_COLUMNS = {
+    "distribution_log_entries": ["created_at", "updated_at"],
+    "tracing_reports": ["created_at", "updated_at"],
+    "approvals_eml": ["uploaded_at"],
+}
+
+
+def _set_server_default(server_default) -> None:
+    # Batch so SQLite (no ALTER COLUMN ... SET DEFAULT) rebuilds the table; elsewhere it's a plain ALTER.
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.DateTime(timezone=False),
+                    existing_nullable=False,
+                    server_default=server_default,
+                )
+
+
+def upgrade() -> None:
+    _set_server_default(sa.text("CURRENT_TIMESTAMP"))
+
+
+def downgrade() -> None:
+    _set_server_default(None)
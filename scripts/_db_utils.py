@@ -7,12 +7,16 @@ from sqlalchemy.orm import Session, sessionmaker
 
 
 def create_script_engine(db_url: str):
-    return create_engine(
-        db_url,
-        future=True,
-        pool_pre_ping=True,
-        pool_recycle=1800,
-    )
+    engine_kwargs: dict[str, object] = {
+        "future": True,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+    }
+    if db_url.startswith("postgres"):
+        # Same pool bounds as the app engine; LIFO keeps reusing the most recently
+        # returned (warm) connection and lets the rest idle out.
+        engine_kwargs.update({"pool_use_lifo": True, "pool_size": 5, "max_overflow": 10})
+    return create_engine(db_url, **engine_kwargs)
 
 
 @contextmanager
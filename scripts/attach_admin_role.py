@@ -14,7 +14,7 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from app.eqms.models import User, Role
+from app.eqms.models import Role, User, UserRole
 from scripts._db_utils import script_session
 
 
@@ -25,18 +25,22 @@ def main() -> None:
 
     db_url = (os.environ.get("DATABASE_URL") or "sqlite:///eqms.db").strip()
     with script_session(db_url) as s:
-        user = s.query(User).filter(User.email.ilike(args.email)).one_or_none()
-        if not user:
+        # Ids only: User and Role eagerly (selectin) load their roles/users/permissions.
+        user_id = s.query(User.id).filter(User.email.ilike(args.email)).scalar()
+        if user_id is None:
             print(f"User not found: {args.email}")
             return
-        role = s.query(Role).filter(Role.key == "admin").one_or_none()
-        if not role:
+        role_id = s.query(Role.id).filter(Role.key == "admin").scalar()
+        if role_id is None:
             print("Admin role not found. Run python scripts/init_db.py first.")
             return
-        if role in (user.roles or []):
+        already = s.query(
+            s.query(UserRole).filter_by(user_id=user_id, role_id=role_id).exists()
+        ).scalar()
+        if already:
             print(f"User already has admin role: {args.email}")
             return
-        user.roles.append(role)
+        s.add(UserRole(user_id=user_id, role_id=role_id))
         print(f"Admin role attached to {args.email}")
 
 
@@ -7,6 +7,7 @@ from __future__ import annotations
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -14,7 +15,7 @@ from app.eqms import create_app
 from app.eqms.db import db_session
 from app.eqms.modules.customer_profiles.models import Customer
 from app.eqms.modules.rep_traceability.models import SalesOrder, OrderPdfAttachment
-from sqlalchemy import func, or_
+from sqlalchemy import case, func, or_
 
 from app.eqms.modules.rep_traceability.parsers.pdf import (
     _extract_text,
@@ -22,7 +23,135 @@ from app.eqms.modules.rep_traceability.parsers.pdf import (
     _parse_customer_email,
     _parse_ship_to_block,
 )
-from app.eqms.storage import storage_from_config
+from app.eqms.storage import Storage, storage_from_config
+
+# PDF downloads are network-bound, so overlap them; submit in batches so only a
+# batch's worth of PDFs/text is in memory at once.
+FETCH_WORKERS = 8
+FETCH_BATCH_SIZE = 32
+# Customers are loaded, processed and committed this many at a time, so progress survives an
+# interrupted run and only one chunk's customers/orders/attachments are held in memory.
+COMMIT_BATCH_SIZE = 512
+
+
+def _fetch_and_parse(storage: Storage, storage_key: str) -> tuple[dict, dict, str | None]:
+    """Read one PDF from storage and parse its bill-to, ship-to and email. Touches no DB state."""
+    with storage.open(storage_key) as fobj:
+        text = _extract_text(fobj)
+    return _parse_bill_to_block(text), _parse_ship_to_block(text), _parse_customer_email(text)
+
+
+def _first_orders_and_attachments(
+    s, customer_ids: list[int]
+) -> tuple[dict[int, SalesOrder], dict[int, OrderPdfAttachment]]:
+    """First sales order per customer and its preferred PDF, in two queries for the whole chunk."""
+    so_ranked = (
+        s.query(
+            SalesOrder.id.label("id"),
+            func.row_number()
+            .over(
+                partition_by=SalesOrder.customer_id,
+                order_by=(SalesOrder.order_date.asc(), SalesOrder.id.asc()),
+            )
+            .label("rn"),
+        )
+        .filter(SalesOrder.customer_id.in_(customer_ids))
+        .subquery()
+    )
+    first_order_by_cust = {
+        so.customer_id: so
+        for so in s.query(SalesOrder)
+        .join(so_ranked, SalesOrder.id == so_ranked.c.id)
+        .filter(so_ranked.c.rn == 1)
+    }
+    if not first_order_by_cust:
+        return first_order_by_cust, {}
+    # Prefer the sales-order page, else the earliest upload.
+    att_ranked = (
+        s.query(
+            OrderPdfAttachment.id.label("id"),
+            func.row_number()
+            .over(
+                partition_by=OrderPdfAttachment.sales_order_id,
+                order_by=(
+                    case((OrderPdfAttachment.pdf_type == "sales_order_page", 0), else_=1),
+                    OrderPdfAttachment.uploaded_at.asc(),
+                    OrderPdfAttachment.id.asc(),
+                ),
+            )
+            .label("rn"),
+        )
+        .filter(OrderPdfAttachment.sales_order_id.in_([so.id for so in first_order_by_cust.values()]))
+        .subquery()
+    )
+    att_by_so = {
+        att.sales_order_id: att
+        for att in s.query(OrderPdfAttachment)
+        .join(att_ranked, OrderPdfAttachment.id == att_ranked.c.id)
+        .filter(att_ranked.c.rn == 1)
+    }
+    return first_order_by_cust, att_by_so
+
+
+def _backfill_chunk(s, storage: Storage, pool: ThreadPoolExecutor, customer_ids: list[int]) -> int:
+    """Fill in addresses for one chunk of customers; returns how many were updated. Doesn't commit."""
+    customers = s.query(Customer).filter(Customer.id.in_(customer_ids)).order_by(Customer.id).all()
+    first_order_by_cust, att_by_so = _first_orders_and_attachments(s, customer_ids)
+
+    work: list[tuple[Customer, SalesOrder, OrderPdfAttachment]] = []
+    for customer in customers:
+        first_order = first_order_by_cust.get(customer.id)
+        if not first_order:
+            print(f"  Skip: {customer.facility_name} - no sales orders")
+            continue
+
+        attachment = att_by_so.get(first_order.id)
+        if not attachment:
+            print(f"  Skip: {customer.facility_name} - no PDF attachment for SO#{first_order.order_number}")
+            continue
+        work.append((customer, first_order, attachment))
+
+    updated = 0
+    # Workers only fetch and parse; the session isn't thread-safe, so customers are
+    # updated here on the main thread.
+    for start in range(0, len(work), FETCH_BATCH_SIZE):
+        futures = {
+            pool.submit(_fetch_and_parse, storage, attachment.storage_key): (customer, first_order)
+            for customer, first_order, attachment in work[start:start + FETCH_BATCH_SIZE]
+        }
+        for future in as_completed(futures):
+            customer, first_order = futures[future]
+            try:
+                bill_to, ship_to, contact_email = future.result()
+            except Exception as e:
+                print(f"Error processing {customer.facility_name}: {e}")
+                continue
+
+            changed = False
+            if bill_to.get("bill_to_address1") and not (customer.address1 or "").strip():
+                customer.address1 = bill_to.get("bill_to_address1")
+                customer.city = bill_to.get("bill_to_city")
+                customer.state = bill_to.get("bill_to_state")
+                customer.zip = bill_to.get("bill_to_zip")
+                changed = True
+            elif ship_to.get("ship_to_address1") and not (customer.address1 or "").strip():
+                customer.address1 = ship_to.get("ship_to_address1")
+                customer.city = ship_to.get("ship_to_city")
+                customer.state = ship_to.get("ship_to_state")
+                customer.zip = ship_to.get("ship_to_zip")
+                changed = True
+            if ship_to.get("ship_to_name") and not (customer.contact_name or "").strip():
+                customer.contact_name = ship_to.get("ship_to_name")
+                changed = True
+            if contact_email and not (customer.contact_email or "").strip():
+                customer.contact_email = contact_email
+                changed = True
+            if changed:
+                updated += 1
+                print(
+                    f"Updated: {customer.facility_name} from SO#{first_order.order_number}"
+                )
+    return updated
 
 
 def backfill_addresses() -> None:
@@ -30,8 +159,9 @@ def backfill_addresses() -> None:
     with app.app_context():
         s = db_session()
 
-        customers_without_address = (
-            s.query(Customer)
+        # Only ids up front; the rows themselves are loaded a chunk at a time below.
+        rows = (
+            s.query(Customer.id, Customer.address1)
             .filter(
                 or_(
                     Customer.address1.is_(None),
@@ -39,80 +169,23 @@ def backfill_addresses() -> None:
                     func.trim(Customer.address1) == "",
                 )
             )
+            .order_by(Customer.id)
             .all()
         )
-        customers_to_process = [c for c in customers_without_address if not (c.address1 or "").strip()]
+        ids_to_process = [cid for cid, address1 in rows if not (address1 or "").strip()]
 
-        print(f"Found {len(customers_to_process)} customers without addresses")
+        print(f"Found {len(ids_to_process)} customers without addresses")
 
         updated = 0
         storage = storage_from_config(app.config)
 
-        for customer in customers_to_process:
-            first_order = (
-                s.query(SalesOrder)
-                .filter(SalesOrder.customer_id == customer.id)
-                .order_by(SalesOrder.order_date.asc())
-                .first()
-            )
-            if not first_order:
-                print(f"  Skip: {customer.facility_name} - no sales orders")
-                continue
-
-            attachment = (
-                s.query(OrderPdfAttachment)
-                .filter(OrderPdfAttachment.sales_order_id == first_order.id)
-                .filter(OrderPdfAttachment.pdf_type == "sales_order_page")
-                .first()
-            )
-            if not attachment:
-                attachment = (
-                    s.query(OrderPdfAttachment)
-                    .filter(OrderPdfAttachment.sales_order_id == first_order.id)
-                    .order_by(OrderPdfAttachment.uploaded_at.asc())
-                    .first()
-                )
-            if not attachment:
-                print(f"  Skip: {customer.facility_name} - no PDF attachment for SO#{first_order.order_number}")
-                continue
-
-            try:
-                with storage.open(attachment.storage_key) as fobj:
-                    pdf_bytes = fobj.read()
-                text = _extract_text(pdf_bytes)
-                bill_to = _parse_bill_to_block(text)
-                ship_to = _parse_ship_to_block(text)
-                contact_email = _parse_customer_email(text)
-
-                changed = False
-                if bill_to.get("bill_to_address1") and not (customer.address1 or "").strip():
-                    customer.address1 = bill_to.get("bill_to_address1")
-                    customer.city = bill_to.get("bill_to_city")
-                    customer.state = bill_to.get("bill_to_state")
-                    customer.zip = bill_to.get("bill_to_zip")
-                    changed = True
-                elif ship_to.get("ship_to_address1") and not (customer.address1 or "").strip():
-                    customer.address1 = ship_to.get("ship_to_address1")
-                    customer.city = ship_to.get("ship_to_city")
-                    customer.state = ship_to.get("ship_to_state")
-                    customer.zip = ship_to.get("ship_to_zip")
-                    changed = True
-                if ship_to.get("ship_to_name") and not (customer.contact_name or "").strip():
-                    customer.contact_name = ship_to.get("ship_to_name")
-                    changed = True
-                if contact_email and not (customer.contact_email or "").strip():
-                    customer.contact_email = contact_email
-                    changed = True
-                if changed:
-                    updated += 1
-                    print(
-                        f"Updated: {customer.facility_name} from SO#{first_order.order_number}"
-                    )
-            except Exception as e:
-                print(f"Error processing {customer.facility_name}: {e}")
-                continue
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+            for start in range(0, len(ids_to_process), COMMIT_BATCH_SIZE):
+                # Everything the chunk loaded goes out of scope on return; after the commit the
+                # session holds no strong references to it either.
+                updated += _backfill_chunk(s, storage, pool, ids_to_process[start:start + COMMIT_BATCH_SIZE])
+                s.commit()
 
-        s.commit()
         print(f"\nBackfill complete: {updated} customers updated")
 
 
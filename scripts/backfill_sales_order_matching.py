@@ -43,7 +43,7 @@ def main() -> None:
     with app.app_context():
         from app.eqms.db import db_session
         from app.eqms.modules.rep_traceability.models import DistributionLogEntry, SalesOrder
-        from sqlalchemy import func
+        from sqlalchemy import func, update
         
         s = db_session()
         
@@ -59,39 +59,47 @@ def main() -> None:
             print("Nothing to do - all distributions are matched.")
             return
         
-        # Build order_number → sales_order_id mapping
-        order_map: dict[str, int] = {}
-        sales_orders = s.query(SalesOrder).all()
-        for so in sales_orders:
-            if so.order_number:
-                key = so.order_number.strip().upper()
-                if key not in order_map:
-                    order_map[key] = so.id
-        
-        print(f"Sales orders available for matching: {len(order_map)}")
+        # order_number key -> lowest sales_order_id, grouped in the database rather than
+        # loading every SalesOrder.
+        # Blank is judged after trimming, so whitespace-only numbers never form a "" key.
+        so_key = func.upper(func.trim(SalesOrder.order_number))
+        so_keys = (
+            s.query(so_key.label("key"), func.min(SalesOrder.id).label("so_id"))
+            .filter(SalesOrder.order_number.isnot(None), so_key != "")
+            .group_by(so_key)
+            .subquery()
+        )
+        print(f"Sales orders available for matching: {s.query(func.count()).select_from(so_keys).scalar()}")
         
-        # Find matches
-        unmatched = (
-            s.query(DistributionLogEntry)
+        # Find matches (plain tuples, streamed)
+        entry_key = func.upper(func.trim(DistributionLogEntry.order_number))
+        candidates = (
+            s.query(DistributionLogEntry.id, DistributionLogEntry.order_number, so_keys.c.so_id)
+            .outerjoin(so_keys, so_keys.c.key == entry_key)
             .filter(DistributionLogEntry.sales_order_id.is_(None))
-            .all()
+            .filter(DistributionLogEntry.order_number.isnot(None), entry_key != "")
+            .yield_per(1000)
         )
         
         matched = 0
         unmatched_order_numbers: set[str] = set()
         
-        for entry in unmatched:
-            if not entry.order_number:
-                continue
-            key = entry.order_number.strip().upper()
-            so_id = order_map.get(key)
+        for entry_id, order_number, so_id in candidates:
             if so_id:
-                if args.execute:
-                    entry.sales_order_id = so_id
                 matched += 1
-                print(f"  Match: Distribution #{entry.id} (order {entry.order_number}) -> SalesOrder #{so_id}")
+                print(f"  Match: Distribution #{entry_id} (order {order_number}) -> SalesOrder #{so_id}")
             else:
-                unmatched_order_numbers.add(entry.order_number)
+                unmatched_order_numbers.add(order_number)
+        
+        if args.execute:
+            # One UPDATE ... FROM against the grouped keys.
+            s.execute(
+                update(DistributionLogEntry)
+                .where(DistributionLogEntry.sales_order_id.is_(None))
+                .where(entry_key == so_keys.c.key)
+                .values(sales_order_id=so_keys.c.so_id)
+                .execution_options(synchronize_session=False)
+            )
         
         if args.execute:
             s.commit()
@@ -7,17 +7,31 @@ from __future__ import annotations
 
 import os
 
-from app.eqms.modules.rep_traceability.models import DistributionLogEntry
+from app.eqms.modules.rep_traceability.models import DistributionLine, DistributionLogEntry, OrderPdfAttachment
 from scripts._db_utils import script_session
 
 
 def main() -> None:
     db_url = (os.environ.get("DATABASE_URL") or "sqlite:///eqms.db").strip()
     with script_session(db_url) as s:
-        rows = s.query(DistributionLogEntry).filter(DistributionLogEntry.source == "pdf_import").all()
-        count = len(rows)
-        for r in rows:
-            s.delete(r)
+        # Bulk statements skip the ORM cascade on DistributionLogEntry.lines, and SQLite doesn't
+        # enforce the FKs' ON DELETE actions, so clear the dependents explicitly first.
+        pdf_entry_ids = (
+            s.query(DistributionLogEntry.id)
+            .filter(DistributionLogEntry.source == "pdf_import")
+            .scalar_subquery()
+        )
+        s.query(DistributionLine).filter(DistributionLine.distribution_entry_id.in_(pdf_entry_ids)).delete(
+            synchronize_session=False
+        )
+        s.query(OrderPdfAttachment).filter(OrderPdfAttachment.distribution_entry_id.in_(pdf_entry_ids)).update(
+            {OrderPdfAttachment.distribution_entry_id: None}, synchronize_session=False
+        )
+        count = (
+            s.query(DistributionLogEntry)
+            .filter(DistributionLogEntry.source == "pdf_import")
+            .delete(synchronize_session=False)
+        )
         print(f"Deleted {count} pdf_import distributions.")
 
 
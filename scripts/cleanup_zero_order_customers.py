@@ -14,21 +14,22 @@ import sys
 from pathlib import Path
 import os
 import argparse
+import json
 
 # Ensure repo root is on sys.path when running as a script
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.eqms.models import User
-from app.eqms.modules.customer_profiles.models import Customer, CustomerNote
+from app.eqms.models import AuditEvent, User
+from app.eqms.modules.customer_profiles.models import Customer, CustomerNote, CustomerRep
 from app.eqms.modules.rep_traceability.models import DistributionLogEntry, SalesOrder
-from app.eqms.audit import record_event
 from scripts._db_utils import script_session
 
+DELETE_CHUNK_SIZE = 1000
+
 
 def find_zero_order_customers(s: Session) -> list[Customer]:
     """
@@ -43,20 +44,12 @@ def find_zero_order_customers(s: Session) -> list[Customer]:
     
     These customers should be cleaned up.
     """
-    # Subquery for sales order counts (source of truth for customer identity)
-    order_count_subq = (
-        s.query(SalesOrder.customer_id, func.count(SalesOrder.id).label("order_count"))
-        .group_by(SalesOrder.customer_id)
-        .subquery()
-    )
-    
-    # Find customers with 0 sales orders
+    # Anti-join: stops at the first sales order per customer (idx_sales_orders_customer_id)
+    # instead of counting every customer's orders.
+    has_orders = s.query(SalesOrder.id).filter(SalesOrder.customer_id == Customer.id).exists()
     zero_order_customers = (
         s.query(Customer)
-        .outerjoin(order_count_subq, Customer.id == order_count_subq.c.customer_id)
-        .filter(
-            (order_count_subq.c.order_count == None) | (order_count_subq.c.order_count == 0)
-        )
+        .filter(~has_orders)
         .order_by(Customer.facility_name)
         .all()
     )
@@ -65,32 +58,38 @@ def find_zero_order_customers(s: Session) -> list[Customer]:
 
 
 def delete_customers(s: Session, customers: list[Customer], admin_user: User) -> int:
-    """Delete customers and record audit events."""
-    deleted_count = 0
-    
-    for customer in customers:
-        # Delete associated notes first (should cascade, but be explicit)
-        s.query(CustomerNote).filter(CustomerNote.customer_id == customer.id).delete()
-        
-        # Record audit event
-        record_event(
-            s,
-            actor=admin_user,
+    """Delete customers (with their notes and rep assignments) and record audit events."""
+    # Same rows record_event() writes, built directly: this runs without a Flask context,
+    # so there is no request id or client IP to record.
+    s.add_all(
+        AuditEvent(
+            actor_user_id=admin_user.id,
+            actor_user_email=admin_user.email,
             action="customer.delete_zero_orders",
             entity_type="Customer",
             entity_id=str(customer.id),
-            metadata={
-                "facility_name": customer.facility_name,
-                "company_key": customer.company_key,
-                "reason": "Zero orders cleanup",
-            },
+            metadata_json=json.dumps(
+                {
+                    "facility_name": customer.facility_name,
+                    "company_key": customer.company_key,
+                    "reason": "Zero orders cleanup",
+                },
+                sort_keys=True,
+            ),
         )
-        
-        # Delete customer
-        s.delete(customer)
-        deleted_count += 1
+        for customer in customers
+    )
+    
+    # Set-based deletes, children first (the ORM cascade isn't involved, and SQLite may not
+    # enforce ON DELETE CASCADE); chunked to stay under bind-parameter limits.
+    ids = [c.id for c in customers]
+    for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+        chunk = ids[start:start + DELETE_CHUNK_SIZE]
+        s.query(CustomerNote).filter(CustomerNote.customer_id.in_(chunk)).delete(synchronize_session=False)
+        s.query(CustomerRep).filter(CustomerRep.customer_id.in_(chunk)).delete(synchronize_session=False)
+        s.query(Customer).filter(Customer.id.in_(chunk)).delete(synchronize_session=False)
     
-    return deleted_count
+    return len(ids)
 
 
 def main():
@@ -0,0 +1,165 @@
+import json
+import sys
+from datetime import date
+
+import pytest
+
+from app.eqms import create_app
+from app.eqms.db import session_scope
+from app.eqms.models import AuditEvent, Base, User
+from app.eqms.modules.customer_profiles.models import Customer, CustomerNote, CustomerRep, Rep
+from app.eqms.modules.rep_traceability.models import (
+    DistributionLine,
+    DistributionLogEntry,
+    OrderPdfAttachment,
+    SalesOrder,
+)
+
+
+@pytest.fixture()
+def app(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SECRET_KEY", "test-secret")
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path/'test.db'}")
+    monkeypatch.setenv("ENV", "test")
+    monkeypatch.setenv("STORAGE_BACKEND", "local")
+
+    app = create_app()
+    Base.metadata.create_all(bind=app.extensions["sqlalchemy_engine"])
+    return app
+
+
+def _entry(order_number: str, *, source: str = "manual", **kw) -> DistributionLogEntry:
+    return DistributionLogEntry(
+        ship_date=date(2025, 1, 15),
+        order_number=order_number,
+        facility_name="Hospital A",
+        sku="211810SPT",
+        lot_number="SLQ-05012025",
+        quantity=1,
+        source=source,
+        **kw,
+    )
+
+
+def _customer(name: str) -> Customer:
+    return Customer(company_key=name.upper().replace(" ", ""), facility_name=name)
+
+
+def _sales_order(customer: Customer, order_number: str, external_key: str) -> SalesOrder:
+    return SalesOrder(
+        order_number=order_number,
+        order_date=date(2025, 1, 15),
+        customer_id=customer.id,
+        source="manual",
+        external_key=external_key,
+    )
+
+
+def test_cleanup_pdf_import_distributions(app):
+    from scripts import cleanup_pdf_import_distributions
+
+    with session_scope(app) as s:
+        pdf_a, pdf_b, manual = _entry("PDF-1", source="pdf_import"), _entry("PDF-2", source="pdf_import"), _entry("M-1")
+        s.add_all([pdf_a, pdf_b, manual])
+        s.flush()
+        for e in (pdf_a, pdf_b, manual):
+            s.add(DistributionLine(distribution_entry_id=e.id, sku="211810SPT", lot_number="SLQ-05012025", quantity=1))
+        s.add_all(
+            [
+                OrderPdfAttachment(distribution_entry_id=pdf_a.id, storage_key="k/a.pdf", filename="a.pdf", pdf_type="sales_order_page"),
+                OrderPdfAttachment(distribution_entry_id=manual.id, storage_key="k/m.pdf", filename="m.pdf", pdf_type="sales_order_page"),
+            ]
+        )
+        manual_id = manual.id
+
+    cleanup_pdf_import_distributions.main()
+
+    with session_scope(app) as s:
+        assert [(e.id, e.source) for e in s.query(DistributionLogEntry)] == [(manual_id, "manual")]
+        # No orphaned lines (SQLite doesn't enforce the FK's ON DELETE CASCADE).
+        assert [l.distribution_entry_id for l in s.query(DistributionLine)] == [manual_id]
+        # Attachments survive; the deleted entry's is unlinked, the other keeps its link.
+        links = {a.filename: a.distribution_entry_id for a in s.query(OrderPdfAttachment)}
+        assert links == {"a.pdf": None, "m.pdf": manual_id}
+
+
+def test_cleanup_zero_order_customers(app, monkeypatch):
+    from scripts import cleanup_zero_order_customers
+
+    with session_scope(app) as s:
+        admin = User(email="admin@example.com", password_hash="x")
+        rep = Rep(name="Rep One")
+        keep, gone_a, gone_b = _customer("Hospital Keep"), _customer("Hospital Gone A"), _customer("Hospital Gone B")
+        s.add_all([admin, rep, keep, gone_a, gone_b])
+        s.flush()
+        s.add(_sales_order(keep, "SO-1", "so-1"))
+        for c in (keep, gone_a, gone_b):
+            s.add(CustomerNote(customer_id=c.id, note_text=f"note for {c.facility_name}"))
+            s.add(CustomerRep(customer_id=c.id, rep_id=rep.id, is_primary=True))
+        admin_id, keep_id = admin.id, keep.id
+        gone = {gone_a.id: "Hospital Gone A", gone_b.id: "Hospital Gone B"}
+
+    monkeypatch.setenv("ADMIN_EMAIL", "admin@example.com")
+    monkeypatch.setattr(sys, "argv", ["cleanup_zero_order_customers.py", "--yes"])
+    cleanup_zero_order_customers.main()
+
+    with session_scope(app) as s:
+        assert [c.id for c in s.query(Customer)] == [keep_id]
+        # Set-based deletes bypass the ORM cascade, so dependents are removed explicitly.
+        assert [n.customer_id for n in s.query(CustomerNote)] == [keep_id]
+        assert [r.customer_id for r in s.query(CustomerRep)] == [keep_id]
+        assert s.query(Rep).count() == 1
+
+        events = s.query(AuditEvent).filter(AuditEvent.action == "customer.delete_zero_orders").all()
+        assert {e.entity_id: json.loads(e.metadata_json)["facility_name"] for e in events} == {
+            str(cid): name for cid, name in gone.items()
+        }
+        assert {(e.entity_type, e.actor_user_id, e.actor_user_email) for e in events} == {
+            ("Customer", admin_id, "admin@example.com")
+        }
+
+
+@pytest.mark.parametrize("flag", ["--dry-run", "--execute"])
+def test_backfill_sales_order_matching(app, monkeypatch, flag):
+    from scripts import backfill_sales_order_matching
+
+    with session_scope(app) as s:
+        cust = _customer("Hospital A")
+        s.add(cust)
+        s.flush()
+        so_first = _sales_order(cust, "SO-100", "a")
+        s.add(so_first)
+        s.flush()
+        # Later duplicates of the same number (case/whitespace differ) and a whitespace-only number.
+        s.add_all([_sales_order(cust, " so-100 ", "b"), _sales_order(cust, "SO-100", "c"), _sales_order(cust, "   ", "d")])
+        so_other = _sales_order(cust, "SO-200", "e")
+        s.add(so_other)
+        s.flush()
+        entries = {
+            "dup": _entry("so-100"),
+            "padded": _entry("  SO-100"),
+            "blank": _entry(""),
+            "spaces": _entry("  "),
+            "no_match": _entry("SO-999"),
+            "already": _entry("SO-100", sales_order_id=so_other.id),
+        }
+        s.add_all(entries.values())
+        s.flush()
+        entry_ids = {k: e.id for k, e in entries.items()}
+        so_first_id, so_other_id = so_first.id, so_other.id
+
+    monkeypatch.setattr(sys, "argv", ["backfill_sales_order_matching.py", flag])
+    backfill_sales_order_matching.main()
+
+    with session_scope(app) as s:
+        got = {k: s.get(DistributionLogEntry, eid).sales_order_id for k, eid in entry_ids.items()}
+    matched = so_first_id if flag == "--execute" else None
+    assert got == {
+        "dup": matched,
+        "padded": matched,
+        "blank": None,
+        "spaces": None,
+        "no_match": None,
+        "already": so_other_id,
+    }
@@ -0,0 +1,66 @@
+import datetime
+import decimal
+import uuid
+
+import pytest
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+from app.eqms import json_provider
+from app.eqms.json_provider import init_json
+
+
+PAYLOADS = [
+    {"shipped": datetime.date(2025, 1, 15), "generated_at": datetime.datetime(2025, 1, 15, 9, 30, 5)},
+    {"amount": decimal.Decimal("1234.50"), "id": uuid.UUID("12345678-1234-5678-1234-567812345678")},
+    {"by_month": {2: 3, 10: 7, 1: 1}},
+    {"facility_name": "Hôpital Sainte-Anne", "b": [1, 2.5, None, True], "a": {"z": 1, "y": 2}},
+    ["plain", "ascii", 1],
+]
+
+
+def _make_app() -> Flask:
+    app = Flask(__name__)
+    init_json(app)
+    return app
+
+
+def _jsonify_bytes(app: Flask, payload) -> bytes:
+    with app.app_context():
+        return jsonify(payload).get_data()
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_jsonify_matches_default_provider_with_orjson(payload):
+    pytest.importorskip("orjson")
+    app = _make_app()
+    assert isinstance(app.json, json_provider.OrjsonProvider)
+
+    reference = Flask(__name__)
+    reference.json = DefaultJSONProvider(reference)
+
+    assert _jsonify_bytes(app, payload) == _jsonify_bytes(reference, payload)
+    assert app.json.loads(app.json.dumps(payload)) == reference.json.loads(reference.json.dumps(payload))
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_jsonify_without_orjson_uses_default_provider(payload, monkeypatch):
+    monkeypatch.setattr(json_provider, "orjson", None)
+    app = _make_app()
+    assert type(app.json) is DefaultJSONProvider
+
+    reference = Flask(__name__)
+    reference.json = DefaultJSONProvider(reference)
+
+    assert _jsonify_bytes(app, payload) == _jsonify_bytes(reference, payload)
+
+
+def test_orjson_provider_uses_overridden_default():
+    pytest.importorskip("orjson")
+    app = _make_app()
+    app.json.default = lambda o: f"<{type(o).__name__}>"
+
+    class Thing:
+        pass
+
+    assert _jsonify_bytes(app, {"x": Thing()}) == b'{"x":"<Thing>"}\n'